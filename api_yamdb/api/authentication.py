@@ -0,0 +1,70 @@
+"""
+JWT-аутентификация без запроса пользователя к БД на каждый запрос.
+
+В кеше хранится снимок пользователя: только поля, нужные проверкам
+прав. Ключ содержит версию пользователя (reviews.versions.user_tag),
+которую сигналы увеличивают после сохранения или удаления пользователя,
+поэтому устаревший снимок больше не читается, даже если он был записан
+параллельным запросом уже после изменения.
+
+С кешем, который виден только своему процессу (LocMemCache), снимок не
+используется: другой процесс не узнает о смене роли или блокировке.
+
+Остальные поля у полученного объекта отложены: код, которому нужен
+полный профиль (users/me), должен перечитать пользователя из БД.
+"""
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (
+    AuthenticationFailed, InvalidToken
+)
+from rest_framework_simplejwt.settings import api_settings
+
+from reviews.versions import get_version, is_shared_cache, user_tag
+
+SNAPSHOT_FIELDS = {
+    'id', 'username', 'role', 'is_superuser', 'is_staff', 'is_active'
+}
+SNAPSHOT_TIMEOUT = 60 * 60
+KEY_TEMPLATE = 'api:user:{}:{}'
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+
+    def get_user(self, validated_token):
+        if api_settings.CHECK_REVOKE_TOKEN or not (
+            is_shared_cache() and is_shared_cache(DEFAULT_CACHE_ALIAS)
+        ):
+            # Для отзыва токена нужен хеш пароля, а локальный кеш не
+            # узнает об изменениях из других процессов.
+            return super().get_user(validated_token)
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                _('Token contained no recognizable user identification')
+            )
+        # from_db() ждёт значения в порядке полей модели.
+        fields = [
+            field.attname for field in self.user_model._meta.concrete_fields
+            if field.attname in SNAPSHOT_FIELDS
+        ]
+        key = KEY_TEMPLATE.format(user_id, get_version(user_tag(user_id)))
+        values = cache.get(key)
+        if values is None:
+            values = self.user_model.objects.filter(
+                **{api_settings.USER_ID_FIELD: user_id}
+            ).values_list(*fields).first()
+            if values is None:
+                raise AuthenticationFailed(
+                    _('User not found'), code='user_not_found'
+                )
+            cache.set(key, values, SNAPSHOT_TIMEOUT)
+        user = self.user_model.from_db(DEFAULT_DB_ALIAS, fields, values)
+        if not user.is_active:
+            raise AuthenticationFailed(
+                _('User is inactive'), code='user_inactive'
+            )
+        return user
@@ -1,13 +1,183 @@
 import django_filters
-from reviews.models import Title
+from django.core.validators import slug_re
+from django.db.models import Exists, F, OuterRef, Q, Subquery
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend, OrderingFilter
+from reviews import leaderboards, search, taxonomy
+from reviews.models import Category, Genre, GenreTitle, Title
+
+
+def split_slugs(value):
+    return [slug.strip() for slug in value.split(',') if slug.strip()]
+
+
+def slug_condition(slug, field='slug'):
+    """
+    Точное совпадение slug, а `slug*` - совпадение по префиксу.
+
+    Префикс ищется диапазоном [prefix, следующая строка), а не LIKE:
+    так запрос идёт по индексу на slug. None - фильтр не нужен.
+    """
+    if not slug.endswith('*'):
+        return Q(**{field: slug})
+    prefix = slug.rstrip('*')
+    if not prefix:
+        return None
+    if not slug_re.match(prefix):
+        # Такого slug нет, а следующий символ после U+10FFFF или
+        # U+D7FF не существует или не кодируется.
+        return Q(pk__in=[])
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return Q(**{f'{field}__gte': prefix, f'{field}__lt': upper})
+
+
+def slugs_condition(slugs, field='slug'):
+    condition = Q()
+    for slug in slugs:
+        slug_q = slug_condition(slug, field)
+        if slug_q is None:
+            return None
+        condition |= slug_q
+    return condition
 
 
 class TitleFilter(django_filters.FilterSet):
-    category = django_filters.CharFilter(
-        field_name='category__slug', lookup_expr='icontains')
-    genre = django_filters.CharFilter(
-        field_name='genre__slug', lookup_expr='icontains')
+    """
+    Фильтры произведений без JOIN в основном запросе.
+
+    category и genre принимают slug или несколько slug через запятую,
+    `slug*` ищет по префиксу. Жанры проверяются подзапросами EXISTS,
+    поэтому произведение с несколькими подходящими жанрами не
+    дублируется в выдаче и DISTINCT не нужен. genre_match=all требует
+    все перечисленные жанры, any (по умолчанию) - хотя бы один.
+    """
+    GENRE_MATCH_CHOICES = (('any', 'any'), ('all', 'all'))
+
+    category = django_filters.CharFilter(method='filter_category')
+    genre = django_filters.CharFilter(method='filter_genre')
+    genre_match = django_filters.ChoiceFilter(
+        choices=GENRE_MATCH_CHOICES, method='filter_genre_match'
+    )
+    year_min = django_filters.NumberFilter(
+        field_name='year', lookup_expr='gte'
+    )
+    year_max = django_filters.NumberFilter(
+        field_name='year', lookup_expr='lte'
+    )
 
     class Meta:
         model = Title
         fields = ['category', 'genre', 'name', 'year']
+
+    def filter_category(self, queryset, name, value):
+        slugs = split_slugs(value)
+        if len(slugs) == 1 and not slugs[0].endswith('*'):
+            # Сравнение на равенство, а не IN: индекс (category, name)
+            # сразу отдаёт произведения в порядке сортировки.
+            return queryset.filter(category=Subquery(
+                Category.objects.filter(slug=slugs[0]).values('id')[:1]
+            ))
+        condition = slugs_condition(slugs)
+        if condition is None:
+            return queryset
+        return queryset.filter(
+            category__in=Category.objects.filter(condition).values('id')
+        )
+
+    def filter_genre(self, queryset, name, value):
+        slugs = split_slugs(value)
+        genre_titles = GenreTitle.objects.filter(title=OuterRef('pk'))
+        if self.form.cleaned_data.get('genre_match') == 'all':
+            for slug in slugs:
+                condition = slug_condition(slug, 'genre__slug')
+                if condition is not None:
+                    queryset = queryset.filter(
+                        Exists(genre_titles.filter(condition))
+                    )
+            return queryset
+        condition = slugs_condition(slugs, 'genre__slug')
+        if condition is None:
+            return queryset
+        return queryset.filter(Exists(genre_titles.filter(condition)))
+
+    def filter_genre_match(self, queryset, name, value):
+        # Учитывается в filter_genre.
+        return queryset
+
+
+class TitleSearchFilter(BaseFilterBackend):
+    """Полнотекстовый поиск `?q=` с сортировкой по релевантности."""
+    search_param = 'q'
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param)
+        if not query:
+            return queryset
+        return search.search_titles(queryset, query)
+
+
+class TitleOrderingFilter(OrderingFilter):
+    """
+    `?ordering=` по одному полю из ordering_fields viewset.
+
+    Берётся первый допустимый ключ, к нему добавляется id в том же
+    направлении: порядок однозначен при равных значениях, и запрос
+    читает составной индекс (поле, id) без сортировки. Несколько ключей
+    или разные направления индекс уже не покрывает.
+
+    Поля из nulls_last_fields при убывании выводят NULL последними, как
+    SQLite по умолчанию: в PostgreSQL DESC ставит NULL первыми, и в
+    начале `?ordering=-rating` оказались бы произведения без оценок.
+    """
+    nulls_last_fields = ('rating',)
+
+    def filter_queryset(self, request, queryset, view):
+        ordering = self.get_ordering(request, queryset, view)
+        if not ordering:
+            return queryset
+        return queryset.order_by(*(
+            F(key[1:]).desc(nulls_last=True)
+            if key.startswith('-') and key[1:] in self.nulls_last_fields
+            else key
+            for key in ordering
+        ))
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if not request.query_params.get(self.ordering_param) or not ordering:
+            return ordering
+        key = ordering[0]
+        if key.lstrip('-') == 'id':
+            return [key]
+        return [key, '-id' if key.startswith('-') else 'id']
+
+
+class LeaderboardFilter(BaseFilterBackend):
+    """
+    Выбор списка reviews.leaderboards: без параметров - all,
+    `?category=`, `?genre=` (slug), `?year=` или `?category=&year=`.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        params = request.query_params
+        category, genre, year = (
+            params.get(name) for name in ('category', 'genre', 'year')
+        )
+        if genre and (category or year):
+            raise ValidationError(
+                {'genre': 'Не сочетается с category и year.'})
+        if year and not year.isdigit():
+            raise ValidationError({'year': 'Ожидается год.'})
+        ids = {}
+        for name, model, slug in (
+            ('category_id', Category, category), ('genre_id', Genre, genre)
+        ):
+            if not slug:
+                continue
+            obj = taxonomy.get_by_slug(model, slug)
+            if obj is None:
+                return queryset.none()
+            ids[name] = obj.pk
+        return queryset.filter(board=leaderboards.board_key(
+            year=int(year) if year else None, **ids
+        ))
@@ -0,0 +1,294 @@
+import json
+import logging
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.urls import router
+from reviews.models import Category, Comment, Genre, Title
+
+User = get_user_model()
+
+BULK_SIZE = 500
+
+# (имя, префикс в роутере, метод, шаблон URL, клиент, тело запроса).
+# reviewer - пользователь без отзывов: generate_data даёт каждому
+# пользователю отзыв на каждое произведение, и отзыв от admin замерял бы
+# только ответ 400 на повторный отзыв.
+SCENARIOS = (
+    ('categories-list', 'categories', 'get', '/api/v1/categories/',
+     'anon', None),
+    ('genres-list', 'genres', 'get', '/api/v1/genres/', 'anon', None),
+    ('titles-list', 'titles', 'get', '/api/v1/titles/', 'anon', None),
+    ('titles-search', 'titles', 'get', '/api/v1/titles/?q=Произведение',
+     'anon', None),
+    ('titles-detail', 'titles', 'get', '/api/v1/titles/{title_id}/',
+     'anon', None),
+    ('users-list', 'users', 'get', '/api/v1/users/', 'admin', None),
+    ('users-detail', 'users', 'get', '/api/v1/users/{username}/',
+     'admin', None),
+    ('users-me', 'users', 'get', '/api/v1/users/me/', 'admin', None),
+    ('signup', 'auth/signup', 'post', '/api/v1/auth/signup/', 'anon',
+     {'username': 'benchmark_user', 'email': 'benchmark@yamdb.fake'}),
+    ('token', 'auth/token', 'post', '/api/v1/auth/token/', 'anon',
+     {'username': '{username}', 'confirmation_code': 'invalid'}),
+    ('reviews-list', r'^titles/(?P<title_id>\d+)/reviews', 'get',
+     '/api/v1/titles/{title_id}/reviews/', 'anon', None),
+    ('reviews-detail', r'^titles/(?P<title_id>\d+)/reviews', 'get',
+     '/api/v1/titles/{title_id}/reviews/{review_id}/', 'anon', None),
+    ('reviews-create', r'^titles/(?P<title_id>\d+)/reviews', 'post',
+     '/api/v1/titles/{title_id}/reviews/', 'reviewer',
+     {'text': 'Замер', 'score': 5}),
+    ('comments-list',
+     r'^titles/(?P<title_id>\d+)/reviews/(?P<review_id>\d+)/comments',
+     'get', '/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+     'anon', None),
+    ('comments-detail',
+     r'^titles/(?P<title_id>\d+)/reviews/(?P<review_id>\d+)/comments',
+     'get',
+     '/api/v1/titles/{title_id}/reviews/{review_id}/comments/{comment_id}/',
+     'anon', None),
+    ('reviews-search', 'search/reviews', 'get',
+     '/api/v1/search/reviews/?q=Отзыв', 'anon', None),
+    ('leaderboards', 'leaderboards', 'get',
+     '/api/v1/leaderboards/?genre={genre}', 'anon', None),
+    ('titles-by-rating', 'titles', 'get', '/api/v1/titles/?ordering=-rating',
+     'anon', None),
+    ('titles-bulk', 'titles', 'post', '/api/v1/titles/bulk/', 'admin',
+     [{'name': f'Замер {number}', 'year': 2000, 'category': '{category}',
+       'genre': ['{genre}']} for number in range(BULK_SIZE)]),
+    ('reviews-import', 'import/reviews', 'post',
+     '/api/v1/import/reviews/?on_conflict=update', 'admin',
+     lambda context: [
+         {'title': title_id, 'author': context['username'], 'score': 5,
+          'text': 'Замер'}
+         for title_id in context['title_ids']
+     ]),
+)
+
+
+def fill(value, context):
+    """Подставляет context в строки тела запроса любой вложенности."""
+    if callable(value):
+        return value(context)
+    if isinstance(value, str):
+        return value.format(**context)
+    if isinstance(value, list):
+        return [fill(item, context) for item in value]
+    if isinstance(value, dict):
+        return {key: fill(item, context) for key, item in value.items()}
+    return value
+
+
+def percentile(values, percent):
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method='inclusive')[
+        percent - 1
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет число запросов к БД и задержку p50/p95/p99 для каждого '
+        'маршрута api/urls.py и сравнивает с сохранённым эталоном.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests', type=int, default=20,
+            help='Количество замеров на каждый эндпоинт.'
+        )
+        parser.add_argument(
+            '--baseline', help='JSON-эталон для сравнения.'
+        )
+        parser.add_argument(
+            '--save', help='Сохранить результаты в JSON-файл.'
+        )
+        parser.add_argument(
+            '--query-tolerance', type=int, default=0,
+            help='Допустимый рост числа запросов к БД.'
+        )
+        parser.add_argument(
+            '--latency-tolerance', type=float, default=1.5,
+            help='Допустимый рост p95 во сколько раз.'
+        )
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1:
+            raise CommandError('--requests должен быть больше нуля.')
+        self.check_coverage()
+        context = self.sample_context()
+        clients = {
+            'anon': Client(),
+            'admin': self.token_client(self.admin),
+            'reviewer': self.token_client(self.reviewer()),
+        }
+        results = {}
+        # Ответы 4xx ожидаемы (повторный отзыв, неверный код) и не должны
+        # засорять вывод предупреждениями django.request.
+        request_logger = logging.getLogger('django.request')
+        level = request_logger.level
+        request_logger.setLevel(logging.ERROR)
+        try:
+            self.run_scenarios(clients, context, options, results)
+        finally:
+            request_logger.setLevel(level)
+        if options['save']:
+            with open(options['save'], 'w', encoding='utf-8') as output:
+                json.dump(results, output, indent=2, ensure_ascii=False)
+        if options['baseline']:
+            self.compare(results, options)
+
+    def run_scenarios(self, clients, context, options, results):
+        # Кеш анонимных ответов выключен: иначе замеряются попадания в
+        # кеш без запросов к БД, и рост их числа не виден.
+        with override_settings(
+            EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+            RESPONSE_CACHE={'ENABLED': False},
+        ):
+            for name, _, method, url, client, data in SCENARIOS:
+                url = url.format(**context)
+                data = fill(data, context)
+                results[name] = self.measure(
+                    clients[client], method, url, data, options['requests']
+                )
+                self.report(name, results[name])
+
+    def check_coverage(self):
+        covered = {route for _, route, *_ in SCENARIOS}
+        missing = [
+            prefix for prefix, _, _ in router.registry
+            if prefix not in covered
+        ]
+        if missing:
+            raise CommandError(
+                f'Нет сценариев для маршрутов: {", ".join(missing)}.'
+            )
+
+    def sample_context(self):
+        comment = (
+            Comment.objects
+            .order_by('id')
+            .values('id', 'review_id', 'review__title_id')
+            .first()
+        )
+        if comment is None:
+            raise CommandError(
+                'В БД нет отзывов или комментариев: загрузите данные '
+                'командами generate_data и load_csv.'
+            )
+        return {
+            'title_id': comment['review__title_id'],
+            'review_id': comment['review_id'],
+            'comment_id': comment['id'],
+            'username': self.admin.username,
+            'category': Category.objects.values_list('slug', flat=True)
+            .first(),
+            'genre': Genre.objects.values_list('slug', flat=True).first(),
+            'title_ids': list(
+                Title.objects.order_by('id')
+                .values_list('id', flat=True)[:BULK_SIZE]
+            ),
+        }
+
+    @staticmethod
+    def token_client(user):
+        token = AccessToken.for_user(user)
+        return Client(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    @staticmethod
+    def reviewer():
+        # Отзывы замеров откатываются, поэтому у него их нет.
+        user, _ = User.objects.get_or_create(
+            username='benchmark_reviewer',
+            defaults={'email': 'benchmark_reviewer@yamdb.fake'},
+        )
+        return user
+
+    @property
+    def admin(self):
+        if not hasattr(self, '_admin'):
+            self._admin = (
+                User.objects.filter(role=User.Role.ADMIN).order_by('id')
+                .first()
+                or User.objects.filter(is_superuser=True).order_by('id')
+                .first()
+            )
+            if self._admin is None:
+                raise CommandError('В БД нет администратора.')
+        return self._admin
+
+    def measure(self, client, method, url, data, count):
+        timings = []
+        queries_count = 0
+        extra = {}
+        if isinstance(data, list):
+            data = json.dumps(data)
+            extra['content_type'] = 'application/json'
+        for _ in range(count):
+            # Изменения откатываются, чтобы замеры не влияли друг на друга.
+            with transaction.atomic():
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    response = getattr(client, method)(
+                        url, data=data, **extra
+                    )
+                    timings.append((time.perf_counter() - started) * 1000)
+                transaction.set_rollback(True)
+            # Максимум, а не последний замер: холодный первый запрос
+            # (справочники, версии) тоже должен попадать в эталон.
+            queries_count = max(
+                queries_count, len(queries.captured_queries)
+            )
+        timings.sort()
+        return {
+            'method': method.upper(),
+            'url': url,
+            'status': response.status_code,
+            'queries': queries_count,
+            'p50_ms': round(percentile(timings, 50), 3),
+            'p95_ms': round(percentile(timings, 95), 3),
+            'p99_ms': round(percentile(timings, 99), 3),
+        }
+
+    def report(self, name, result):
+        self.stdout.write(
+            f'{name:<16} {result["status"]} {result["queries"]:>3} запр. '
+            f'p50 {result["p50_ms"]:>8.2f} мс  p95 {result["p95_ms"]:>8.2f} '
+            f'мс  p99 {result["p99_ms"]:>8.2f} мс'
+        )
+
+    def compare(self, results, options):
+        with open(options['baseline'], encoding='utf-8') as baseline_file:
+            baseline = json.load(baseline_file)
+        regressions = []
+        for name, result in results.items():
+            expected = baseline.get(name)
+            if expected is None:
+                continue
+            if result['queries'] > (
+                expected['queries'] + options['query_tolerance']
+            ):
+                regressions.append(
+                    f'{name}: {result["queries"]} запросов к БД вместо '
+                    f'{expected["queries"]}'
+                )
+            if result['p95_ms'] > (
+                expected['p95_ms'] * options['latency_tolerance']
+            ):
+                regressions.append(
+                    f'{name}: p95 {result["p95_ms"]} мс вместо '
+                    f'{expected["p95_ms"]} мс'
+                )
+        if regressions:
+            raise CommandError(
+                'Регрессии производительности:\n' + '\n'.join(regressions)
+            )
+        self.stdout.write(self.style.SUCCESS('Регрессий не найдено.'))
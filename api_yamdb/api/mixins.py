@@ -0,0 +1,248 @@
+import hashlib
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.utils.http import parse_etags, urlencode
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.fields import empty
+from rest_framework.generics import get_object_or_404
+from rest_framework.response import Response
+
+from api_yamdb.timing import phase
+from reviews.models import Review, Title
+from reviews.versions import CATALOG_TAG, get_versions
+
+
+class TitleNestedMixin:
+    """
+    Произведение из URL вложенного ресурса.
+
+    Загружается только id и только один раз за запрос: viewset
+    создаётся на каждый запрос, а сериализаторы получают его через
+    context['view'].
+    """
+
+    def get_title(self):
+        if not hasattr(self, '_title'):
+            self._title = get_object_or_404(
+                Title.objects.only('id'), pk=self.kwargs['title_id']
+            )
+        return self._title
+
+
+class ReviewNestedMixin:
+    """Отзыв из URL, принадлежащий произведению из того же URL."""
+
+    def get_review(self):
+        if not hasattr(self, '_review'):
+            self._review = get_object_or_404(
+                Review.objects.only('id'),
+                pk=self.kwargs['review_id'],
+                title_id=self.kwargs['title_id'],
+            )
+        return self._review
+
+
+class TimedViewMixin:
+    """
+    Отмечает фазы view, аутентификации и проверки прав для Server-Timing.
+
+    Фаза view - вся обработка во view; auth, perm и serialize входят в неё.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        with phase('view'):
+            return super().dispatch(request, *args, **kwargs)
+
+    def perform_authentication(self, request):
+        with phase('auth'):
+            super().perform_authentication(request)
+
+    def check_permissions(self, request):
+        with phase('perm'):
+            super().check_permissions(request)
+
+    def check_object_permissions(self, request, obj):
+        with phase('perm'):
+            super().check_object_permissions(request, obj)
+
+
+class TimedSerializerMixin:
+    """Отмечает фазу сериализации, включая ленивые запросы к БД."""
+
+    def to_representation(self, instance):
+        with phase('serialize'):
+            return super().to_representation(instance)
+
+    def run_validation(self, data=empty):
+        with phase('serialize'):
+            return super().run_validation(data)
+
+
+class BatchMixin:
+    """
+    Пакетные запросы: тело - список объектов, ответ - список той же
+    длины с результатом или ошибками для каждого элемента.
+    """
+    batch_max_items = 5000
+
+    def get_batch(self, request):
+        items = request.data
+        if not isinstance(items, list) or not items:
+            raise ValidationError(
+                {'detail': 'Ожидается непустой список объектов.'})
+        if len(items) > self.batch_max_items:
+            raise ValidationError(
+                {'detail': f'Не больше {self.batch_max_items} объектов '
+                           'за запрос.'})
+        return items
+
+    def batch_response(self, results, accepted):
+        """201 - приняты все элементы, 207 - часть, 400 - ни одного."""
+        if accepted == len(results):
+            response_status = status.HTTP_201_CREATED
+        elif accepted:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+        return Response(results, status=response_status)
+
+
+class NotModified(Exception):
+    """Версии тегов совпали с If-None-Match."""
+
+
+class ConditionalGetMixin:
+    """
+    ETag для list и retrieve по версиям тегов (reviews.versions).
+
+    ETag считается после проверки прав, но до чтения данных: если версии
+    не изменились, ответ 304 отдаётся без запросов к данным и
+    сериализации. Viewset перечисляет теги, от которых зависит ответ,
+    в get_version_tags().
+    """
+    conditional_actions = ('list', 'retrieve')
+
+    def get_version_tags(self):
+        raise NotImplementedError
+
+    def get_etag(self):
+        versions = get_versions(CATALOG_TAG, *self.get_version_tags())
+        value = f'{self.request.accepted_media_type}:{versions}'
+        return '"{}"'.format(hashlib.md5(value.encode()).hexdigest())
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.etag = None
+        if self.action not in self.conditional_actions:
+            return
+        self.etag = self.get_etag()
+        if_none_match = parse_etags(request.headers.get('If-None-Match', ''))
+        if self.etag in {tag.replace('W/', '', 1) for tag in if_none_match}:
+            raise NotModified
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return Response(status=status.HTTP_304_NOT_MODIFIED)
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        etag = getattr(self, 'etag', None)
+        if etag and response.status_code in (
+            status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED
+        ):
+            response['ETag'] = etag
+        return response
+
+
+RESPONSE_CACHE_DEFAULTS = {
+    'ENABLED': True,
+    'ALIAS': 'default',
+    'TIMEOUT': 60 * 5,
+}
+
+
+def get_response_cache_config():
+    return {
+        **RESPONSE_CACHE_DEFAULTS, **getattr(settings, 'RESPONSE_CACHE', {})
+    }
+
+
+class CachedResponse(Exception):
+    def __init__(self, response):
+        super().__init__()
+        self.response = response
+
+
+def store_response(cache, key, timeout, response):
+    cache.set(key, (response.content, response['Content-Type']), timeout)
+
+
+class AnonymousCacheMixin(ConditionalGetMixin):
+    """
+    Общий кеш готовых ответов для анонимных GET-запросов list/retrieve.
+
+    Ключ - схема, хост, путь, отсортированная строка запроса и ETag, а
+    ETag уже содержит формат ответа и версии тегов. После изменения
+    данных старые записи перестают читаться и вытесняются по TIMEOUT,
+    поэтому кеш сбрасывается точно по тегам и работает с любым бэкендом
+    кеша.
+    """
+
+    def get_response_cache_key(self):
+        query = urlencode(
+            sorted(self.request.query_params.lists()), doseq=True
+        )
+        # Ссылки next/previous в теле абсолютные: схема и хост входят
+        # в ключ, иначе страница одного хоста отдаётся другому.
+        value = (
+            f'{self.request.scheme}://{self.request.get_host()}'
+            f'{self.request.path}?{query}:{self.etag}'
+        )
+        return 'api:response:' + hashlib.md5(value.encode()).hexdigest()
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.response_cache_key = None
+        config = get_response_cache_config()
+        if (
+            not config['ENABLED'] or self.etag is None
+            or request.method != 'GET' or request.user.is_authenticated
+        ):
+            return
+        self.response_cache_key = self.get_response_cache_key()
+        cached = caches[config['ALIAS']].get(self.response_cache_key)
+        if cached is not None:
+            content, content_type = cached
+            raise CachedResponse(
+                HttpResponse(content, content_type=content_type)
+            )
+
+    def handle_exception(self, exc):
+        if isinstance(exc, CachedResponse):
+            return exc.response
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        key = getattr(self, 'response_cache_key', None)
+        if (
+            key and isinstance(response, Response)
+            and response.status_code == status.HTTP_200_OK
+            and not response.streaming
+        ):
+            config = get_response_cache_config()
+            # Содержимое появляется только после рендеринга ответа.
+            response.add_post_render_callback(partial(
+                store_response, caches[config['ALIAS']], key,
+                config['TIMEOUT']
+            ))
+        return response
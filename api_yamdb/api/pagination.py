@@ -0,0 +1,77 @@
+from django.conf import settings
+from rest_framework import pagination
+
+
+class KeysetPagination(pagination.CursorPagination):
+    """
+    Курсорная пагинация по порядку, заданному во view.
+
+    Сортировка берётся из `get_cursor_ordering()` или атрибута
+    `cursor_ordering` view и должна совпадать с составным индексом
+    модели: страница читается без COUNT(*) и OFFSET.
+    """
+    page_size = settings.REST_FRAMEWORK['PAGE_SIZE']
+    page_size_query_param = 'limit'
+    max_page_size = 100
+
+    def get_ordering(self, request, queryset, view):
+        if hasattr(view, 'get_cursor_ordering'):
+            return view.get_cursor_ordering()
+        return view.cursor_ordering
+
+
+class CursorSwitchPagination(pagination.BasePagination):
+    """
+    Пагинация с включаемым курсорным режимом.
+
+    По умолчанию работает `default_pagination_class`. Курсорный режим
+    включается параметром `?pagination=cursor`, дальнейшие страницы
+    узнаются по параметру `cursor` в ссылке `next`.
+    """
+    default_pagination_class = None
+    cursor_pagination_class = KeysetPagination
+    mode_query_param = 'pagination'
+    cursor_mode = 'cursor'
+
+    def __init__(self):
+        self.paginator = self.default_pagination_class()
+
+    def use_cursor(self, request):
+        return (
+            request.query_params.get(self.mode_query_param)
+            == self.cursor_mode
+            or self.cursor_pagination_class.cursor_query_param
+            in request.query_params
+        )
+
+    @property
+    def display_page_controls(self):
+        return getattr(self.paginator, 'display_page_controls', False)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.use_cursor(request):
+            self.paginator = self.cursor_pagination_class()
+        return self.paginator.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return self.paginator.get_paginated_response_schema(schema)
+
+    def to_html(self):
+        return self.paginator.to_html()
+
+    def get_results(self, data):
+        return self.paginator.get_results(data)
+
+    def get_schema_operation_parameters(self, view):
+        return self.paginator.get_schema_operation_parameters(view)
+
+
+class LimitOffsetOrCursorPagination(CursorSwitchPagination):
+    default_pagination_class = pagination.LimitOffsetPagination
+
+
+class PageNumberOrCursorPagination(CursorSwitchPagination):
+    default_pagination_class = pagination.PageNumberPagination
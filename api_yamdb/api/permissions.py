@@ -31,5 +31,5 @@ class IsAuthorOrStaffOrReadOnly(permissions.BasePermission):
             request.user.is_moderator
             or request.user.is_admin
             or request.user.is_superuser
-            or obj.author == request.user
+            or obj.author_id == request.user.id
         )
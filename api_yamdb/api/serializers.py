@@ -1,10 +1,17 @@
+from operator import itemgetter
+
 from rest_framework import serializers
-from reviews.models import Category, Comment, Genre, Title, Review
-from django.forms import ValidationError
+from reviews import taxonomy
+from reviews.models import (
+    Category, Comment, Genre, LeaderboardEntry, Title, Review
+)
 from django.contrib.auth import get_user_model
+from django.db.models import Q
 from django.shortcuts import get_object_or_404
 from rest_framework.validators import UniqueValidator
 from rest_framework_simplejwt.tokens import AccessToken
+from .mixins import TimedSerializerMixin
+from .utils import confirmation_codes
 from .validators import validate_username
 from rest_framework.relations import SlugRelatedField
 
@@ -12,7 +19,7 @@ from rest_framework.relations import SlugRelatedField
 User = get_user_model()
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Category
         fields = ['name', 'slug']
@@ -25,7 +32,7 @@ class CategorySerializer(serializers.ModelSerializer):
         return value
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Genre
         fields = ['name', 'slug']
@@ -42,11 +49,26 @@ class SlugJsonRelatedField(serializers.SlugRelatedField):
     def __init__(self, slug_field=None, **kwargs):
         super().__init__(slug_field, **kwargs)
 
+    def to_internal_value(self, data):
+        # Категории и жанры берутся из кеша справочников, а не из БД.
+        if not isinstance(data, str):
+            self.fail('invalid')
+        model = self.get_queryset().model
+        # Пакетная вставка заранее находит slug всего пакета.
+        resolved = self.context.get('taxonomy')
+        if resolved is not None:
+            obj = resolved[model].get(data)
+        else:
+            obj = taxonomy.get_by_slug(model, data)
+        if obj is None:
+            self.fail('does_not_exist', slug_name=self.slug_field, value=data)
+        return obj
+
     def to_representation(self, obj):
         return obj.to_json()
 
 
-class TitleSerializer(serializers.ModelSerializer):
+class TitleSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     category = SlugJsonRelatedField(
         slug_field='slug', queryset=Category.objects.all())
 
@@ -63,10 +85,59 @@ class TitleSerializer(serializers.ModelSerializer):
             'description',
             'rating'
         )
+        read_only_fields = ('rating',)
         model = Title
 
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        # Жанры подгружаются без ORDER BY, чтобы не сортировать их в БД
+        # для каждой страницы: на произведение их единицы.
+        data['genre'].sort(key=itemgetter('name'))
+        return data
+
 
-class TokenSerializer(serializers.Serializer):
+class TitleBulkSerializer(TitleSerializer):
+    """
+    Произведение из пакета titles/bulk. Slug категорий и жанров ищутся
+    в context['taxonomy'], который собирает resolve_slugs.
+    """
+    genre = SlugJsonRelatedField(
+        slug_field='slug', queryset=Genre.objects.all(), many=True,
+        allow_empty=False)
+
+    @staticmethod
+    def resolve_slugs(items):
+        """Находит slug всех элементов: не больше запроса на справочник."""
+        slugs = {Category: set(), Genre: set()}
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            # Остальные значения отклонит SlugJsonRelatedField.
+            category = item.get('category')
+            if isinstance(category, str):
+                slugs[Category].add(category)
+            genres = item.get('genre')
+            if isinstance(genres, list):
+                slugs[Genre].update(
+                    slug for slug in genres if isinstance(slug, str)
+                )
+        return {
+            model: taxonomy.get_many_by_slug(model, values)
+            for model, values in slugs.items()
+        }
+
+
+class LeaderboardEntrySerializer(TimedSerializerMixin,
+                                 serializers.ModelSerializer):
+    """Место в рейтинге: взвешенная оценка и произведение целиком."""
+    title = TitleSerializer(read_only=True)
+
+    class Meta:
+        fields = ('score', 'title')
+        model = LeaderboardEntry
+
+
+class TokenSerializer(TimedSerializerMixin, serializers.Serializer):
     username = serializers.CharField(write_only=True)
     confirmation_code = serializers.CharField(write_only=True)
     token = serializers.CharField(read_only=True)
@@ -77,14 +148,17 @@ class TokenSerializer(serializers.Serializer):
 
     def validate(self, attrs):
         user = get_object_or_404(User, username=attrs.get("username"))
-        if attrs.get("confirmation_code") == str(user.code):
+        if confirmation_codes.check_code(
+            user, attrs.get("confirmation_code")
+        ):
             token = AccessToken.for_user(user)
             return {"token": str(token)}
         raise serializers.ValidationError(
             {"confirmation_code": "Неверный код подтверждения"})
 
 
-class UserRegistrationSerializer(serializers.ModelSerializer):
+class UserRegistrationSerializer(TimedSerializerMixin,
+                                 serializers.ModelSerializer):
     email = serializers.EmailField(
         max_length=254,
         required=True,
@@ -105,6 +179,45 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         fields = ('username', 'email')
 
 
+class SignupSerializer(TimedSerializerMixin, serializers.Serializer):
+    """
+    Регистрация без UniqueValidator: занятость username и email
+    проверяется одним запросом в find_user, а гонку двух регистраций
+    разрешают уникальные индексы БД.
+    """
+    email = serializers.EmailField(max_length=254)
+    username = serializers.CharField(
+        max_length=150, validators=[validate_username]
+    )
+
+    def find_user(self):
+        """
+        Возвращает пользователя с этой парой username и email или None.
+
+        Если username или email занят другим пользователем - ошибка
+        валидации.
+        """
+        username = self.validated_data['username']
+        email = self.validated_data['email']
+        users = User.objects.filter(
+            Q(username=username) | Q(email=email)
+        ).only('id', 'username', 'email', 'password')[:2]
+        errors = {}
+        for user in users:
+            if user.username == username and user.email == email:
+                return user
+            if user.username == username:
+                errors['username'] = ['Этот username уже используется']
+            if user.email == email:
+                errors['email'] = ['Этот email уже используется']
+        if errors:
+            raise serializers.ValidationError(errors)
+        return None
+
+    def create(self, validated_data):
+        return User.objects.create(**validated_data)
+
+
 class UsersSerializer(UserRegistrationSerializer):
     class Meta:
         model = User
@@ -121,31 +234,30 @@ class UpdateUsersSerializer(UserRegistrationSerializer):
         )
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     author = SlugRelatedField(slug_field='username', read_only=True)
 
-    def validate(self, attrs):
-        request = self.context.get('request')
-        if request is None:
-            raise ValidationError('Не удалось получить объект запроса!')
-        if request.method != 'POST':
-            return attrs
-        title_id = self.context.get('view').kwargs.get('title_id')
-        title = get_object_or_404(Title, pk=title_id)
-        if (
-            not Review.objects
-            .filter(title=title, author=request.user)
-            .exists()
-        ):
-            return attrs
-        raise ValidationError('Может существовать только один отзыв!')
-
     class Meta:
         fields = ('id', 'text', 'author', 'score', 'pub_date')
         model = Review
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class ReviewSearchSerializer(ReviewSerializer):
+    title = serializers.IntegerField(source='title_id', read_only=True)
+
+    class Meta(ReviewSerializer.Meta):
+        fields = ('id', 'title', 'text', 'author', 'score', 'pub_date')
+
+
+class ReviewImportSerializer(TimedSerializerMixin, serializers.Serializer):
+    """Строка пакетного импорта отзывов; автор задаётся username."""
+    title = serializers.IntegerField(min_value=1)
+    author = serializers.CharField(max_length=150)
+    score = serializers.IntegerField(min_value=1, max_value=10)
+    text = serializers.CharField()
+
+
+class CommentSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     author = SlugRelatedField(slug_field='username', read_only=True)
 
     class Meta:
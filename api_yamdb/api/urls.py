@@ -3,7 +3,8 @@ from rest_framework.routers import DefaultRouter
 from .views import (
     CategoryViewSet, GenreViewSet, TitleViewSet,
     UserRegistrationViewSet, UserVerificationViewSet,
-    UsersViewSet, ReviewViewSet, CommentViewSet)
+    UsersViewSet, ReviewViewSet, ReviewSearchViewSet, ReviewImportViewSet,
+    CommentViewSet, LeaderboardViewSet)
 
 
 router = DefaultRouter()
@@ -21,6 +22,12 @@ router.register(
     CommentViewSet,
     basename='comments'
 )
+router.register(
+    'search/reviews', ReviewSearchViewSet, basename='review-search')
+router.register(
+    'import/reviews', ReviewImportViewSet, basename='review-import')
+router.register(
+    'leaderboards', LeaderboardViewSet, basename='leaderboards')
 urlpatterns = [
     path('v1/', include(router.urls)),
 ]
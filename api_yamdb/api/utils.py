@@ -1,12 +1,75 @@
-import random
-from django.core.mail import send_mail
+from datetime import datetime
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare, salted_hmac
+from django.utils.http import base36_to_int, int_to_base36
+from reviews.outbox import enqueue
 
 
 def send_verification_email(user, code):
+    # Письмо ставится в очередь и отправляется командой send_outbox.
     subject = 'Верификация электронной почты'
     message = f'Ваш код подтверждения: {code}'
-    send_mail(subject, message, 'from@example.com', [user.email])
+    enqueue(subject, message, user.email, 'from@example.com')
+
+
+class ConfirmationCodeGenerator:
+    """
+    Коды подтверждения без хранения в БД.
+
+    Код - это время выпуска и HMAC от id, email, хеша пароля пользователя
+    и этого времени. Проверка не пишет в БД (кроме старых кодов, см.
+    _check_legacy_code), а код истекает сам через
+    CONFIRMATION_CODE_TIMEOUT секунд. Смена email или пароля отзывает
+    выданные коды.
+    """
+    key_salt = 'api.utils.ConfirmationCodeGenerator'
+
+    def make_code(self, user):
+        return self._make_code(user, self._now())
+
+    def check_code(self, user, code):
+        if not isinstance(code, str) or not code:
+            return False
+        if self._check_legacy_code(user, code):
+            return True
+        try:
+            ts_b36, _ = code.split('-')
+            timestamp = base36_to_int(ts_b36)
+        except ValueError:
+            return False
+        if not constant_time_compare(self._make_code(user, timestamp), code):
+            return False
+        return (
+            0 <= self._now() - timestamp
+            <= settings.CONFIRMATION_CODE_TIMEOUT
+        )
+
+    @staticmethod
+    def _check_legacy_code(user, code):
+        """
+        Коды, выданные до перехода на HMAC, хранятся в user.code. Они
+        одноразовые и принимаются до LEGACY_CONFIRMATION_CODES_UNTIL.
+        """
+        until = getattr(settings, 'LEGACY_CONFIRMATION_CODES_UNTIL', None)
+        if not user.code or until is None or timezone.now() >= until:
+            return False
+        if not constant_time_compare(code, user.code):
+            return False
+        type(user).objects.filter(pk=user.pk).update(code='')
+        user.code = ''
+        return True
+
+    def _make_code(self, user, timestamp):
+        value = f'{user.pk}{user.email}{user.password}{timestamp}'
+        digest = salted_hmac(self.key_salt, value, algorithm='sha256')
+        return f'{int_to_base36(timestamp)}-{digest.hexdigest()[::4]}'
+
+    @staticmethod
+    def _now():
+        # Секунды с 2001-01-01, как в django.contrib.auth.tokens.
+        return int((datetime.now() - datetime(2001, 1, 1)).total_seconds())
 
 
-def generate_verification_code():
-    return random.randint(100000, 999999)
+confirmation_codes = ConfirmationCodeGenerator()
@@ -1,9 +1,22 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Prefetch
+from django.http import StreamingHttpResponse
 from rest_framework.viewsets import ModelViewSet
 from rest_framework.exceptions import ValidationError
-from rest_framework.generics import get_object_or_404
-from .filters import TitleFilter
-from reviews.models import Category, Genre, Title, Review
-from .utils import send_verification_email, generate_verification_code
+from .filters import (
+    LeaderboardFilter, TitleFilter, TitleOrderingFilter, TitleSearchFilter
+)
+from reviews import export, search, taxonomy
+from reviews.bulk import build_reviews, bulk_create_titles, import_reviews
+from reviews.models import (
+    Category, Comment, Genre, LeaderboardEntry, Review, Title
+)
+from reviews.ratings import apply_review_delta
+from reviews.versions import (
+    AUTHORS_TAG, TITLES_TAG, review_comments_tag, title_reviews_tag,
+    title_tag
+)
+from .utils import confirmation_codes, send_verification_email
 from rest_framework.pagination import LimitOffsetPagination
 from django.contrib.auth import get_user_model
 from rest_framework.response import Response
@@ -13,12 +26,21 @@ from rest_framework.permissions import (
 )
 from rest_framework import status, filters, viewsets, mixins
 from rest_framework.decorators import action
+from rest_framework.settings import api_settings
+from .mixins import (
+    AnonymousCacheMixin, BatchMixin, ReviewNestedMixin, TimedViewMixin,
+    TitleNestedMixin
+)
+from .pagination import (
+    LimitOffsetOrCursorPagination, PageNumberOrCursorPagination
+)
 from .permissions import IsAdminOrReadOnly, IsAdmin, IsAuthorOrStaffOrReadOnly
 from .serializers import (
-    CategorySerializer, GenreSerializer, TitleSerializer,
-    UserRegistrationSerializer, UsersSerializer,
+    CategorySerializer, GenreSerializer, TitleSerializer, TitleBulkSerializer,
+    SignupSerializer, UsersSerializer,
     UpdateUsersSerializer, TokenSerializer,
-    ReviewSerializer, CommentSerializer
+    ReviewSerializer, ReviewSearchSerializer, ReviewImportSerializer,
+    CommentSerializer, LeaderboardEntrySerializer
 )
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.exceptions import MethodNotAllowed
@@ -27,7 +49,23 @@ from rest_framework.exceptions import MethodNotAllowed
 User = get_user_model()
 
 
-class CategoryViewSet(mixins.CreateModelMixin, mixins.DestroyModelMixin,
+class CachedTaxonomyMixin(AnonymousCacheMixin):
+    """Список справочника без поиска отдаётся из кеша процесса."""
+
+    def get_version_tags(self):
+        return [taxonomy.TAG]
+
+    def get_queryset(self):
+        search_param = filters.SearchFilter.search_param
+        if self.action == 'list' and not self.request.query_params.get(
+            search_param
+        ):
+            return taxonomy.get_all(self.queryset.model)
+        return super().get_queryset()
+
+
+class CategoryViewSet(TimedViewMixin, CachedTaxonomyMixin,
+                      mixins.CreateModelMixin, mixins.DestroyModelMixin,
                       mixins.ListModelMixin, viewsets.GenericViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
@@ -62,7 +100,8 @@ class CategoryViewSet(mixins.CreateModelMixin, mixins.DestroyModelMixin,
         return super().destroy(request, *args, **kwargs)
 
 
-class GenreViewSet(mixins.CreateModelMixin, mixins.DestroyModelMixin,
+class GenreViewSet(TimedViewMixin, CachedTaxonomyMixin,
+                   mixins.CreateModelMixin, mixins.DestroyModelMixin,
                    mixins.ListModelMixin, viewsets.GenericViewSet):
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
@@ -97,13 +136,51 @@ class GenreViewSet(mixins.CreateModelMixin, mixins.DestroyModelMixin,
         return super().destroy(request, *args, **kwargs)
 
 
-class TitleViewSet(ModelViewSet):
-    queryset = Title.objects.all()
+class TitleViewSet(TimedViewMixin, AnonymousCacheMixin, BatchMixin,
+                   ModelViewSet):
+    # Категория и жанры подгружаются пачкой, рейтинг хранится в самой
+    # таблице: страница списка стоит фиксированное число запросов.
+    queryset = (
+        Title.objects
+        .select_related('category')
+        .prefetch_related(
+            Prefetch('genre', queryset=Genre.objects.order_by())
+        )
+    )
     serializer_class = TitleSerializer
     permission_classes = [IsAdminOrReadOnly]
-    pagination_class = LimitOffsetPagination
-    filter_backends = (DjangoFilterBackend,)
+    pagination_class = LimitOffsetOrCursorPagination
+    cursor_ordering = ('name', 'id')
+    filter_backends = (
+        DjangoFilterBackend, TitleSearchFilter, TitleOrderingFilter
+    )
     filterset_class = TitleFilter
+    # У каждого ключа есть индекс (поле, id) в Title.Meta.indexes.
+    ordering_fields = ('rating', 'reviews_count', 'year', 'name')
+    # Курсор хранит значение первого поля, а rating бывает NULL.
+    cursor_ordering_fields = ('reviews_count', 'year', 'name')
+
+    def get_cursor_ordering(self):
+        ordering = TitleOrderingFilter().get_ordering(
+            self.request, None, self
+        )
+        # Без допустимого ?ordering= - порядок по умолчанию, как и без
+        # курсора.
+        if not ordering:
+            return self.cursor_ordering
+        ordering_param = TitleOrderingFilter.ordering_param
+        if ordering[0].lstrip('-') not in self.cursor_ordering_fields:
+            raise ValidationError({ordering_param: (
+                'Курсорная пагинация поддерживает сортировку только по '
+                f'{", ".join(self.cursor_ordering_fields)}.'
+            )})
+        return ordering
+
+    def get_version_tags(self):
+        # Категории и жанры выводятся в произведении целиком.
+        if self.action == 'retrieve':
+            return [taxonomy.TAG, title_tag(self.kwargs['pk'])]
+        return [taxonomy.TAG, TITLES_TAG]
 
     def create(self, request, *args, **kwargs):
         name = request.data.get('name')
@@ -136,32 +213,100 @@ class TitleViewSet(ModelViewSet):
 
         raise MethodNotAllowed(request.method)
 
+    @action(
+        detail=False, methods=['post'], url_path='bulk',
+        permission_classes=[IsAuthenticated, IsAdmin])
+    def bulk(self, request):
+        """
+        Создаёт список произведений одной транзакцией.
+
+        Ответ - список той же длины: {"id": ...} для созданного
+        произведения или {"errors": {...}} для отклонённого. Статус 201,
+        если созданы все, 207 - если часть, 400 - если ни одного.
+        """
+        items = self.get_batch(request)
+        serializer = TitleBulkSerializer(context={
+            **self.get_serializer_context(),
+            'taxonomy': TitleBulkSerializer.resolve_slugs(items),
+        })
+        results, titles, genres = [], [], []
+        for item in items:
+            try:
+                data = serializer.run_validation(item)
+            except ValidationError as error:
+                results.append({'errors': error.detail})
+                continue
+            genres.append(data.pop('genre'))
+            titles.append(Title(**data))
+            results.append(titles[-1])
+        if titles:
+            bulk_create_titles(titles, genres)
+        return self.batch_response([
+            {'id': result.pk} if isinstance(result, Title) else result
+            for result in results
+        ], len(titles))
+
+    @action(
+        detail=False, methods=['get'], url_path='export',
+        permission_classes=[IsAuthenticated, IsAdmin])
+    def export(self, request):
+        """Выгрузка каталога потоком: NDJSON или CSV-таблица static/data."""
+        output = request.query_params.get('output', 'ndjson')
+        if output == 'ndjson':
+            lines = export.iter_ndjson()
+            content_type = 'application/x-ndjson'
+            filename = 'titles.ndjson'
+        elif output == 'csv':
+            filename = request.query_params.get('table', 'titles.csv')
+            if filename not in export.CSV_TABLES:
+                raise ValidationError(
+                    {'table': f'Допустимые значения: '
+                              f'{", ".join(sorted(export.CSV_TABLES))}.'})
+            lines = export.iter_csv(filename)
+            content_type = 'text/csv; charset=utf-8'
+        else:
+            raise ValidationError(
+                {'output': 'Допустимые значения: ndjson, csv.'})
+        response = StreamingHttpResponse(lines, content_type=content_type)
+        response['Content-Disposition'] = (
+            f'attachment; filename="{filename}"'
+        )
+        return response
+
 
 class UserRegistrationViewSet(
-    mixins.CreateModelMixin, viewsets.GenericViewSet
+    TimedViewMixin, mixins.CreateModelMixin, viewsets.GenericViewSet
 ):
-    serializer_class = UserRegistrationSerializer
+    serializer_class = SignupSerializer
 
     def create(self, request, *args, **kwargs):
-        result = User.objects.filter(
-            username=request.data.get('username'),
-            email=request.data.get('email')
-        ).first()
-        if not result:
-            serializer = self.serializer_class(data=request.data)
-            serializer.is_valid(raise_exception=True)
-            result = serializer.save()
-            result.code = generate_verification_code()
-            result.save()
-        send_verification_email(result, result.code)
-        return Response(
-            {'username': result.username, 'email': result.email},
-            status=status.HTTP_200_OK
-        )
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        user = serializer.find_user()
+        if user is None:
+            try:
+                # Новый пользователь и письмо с кодом сохраняются в одной
+                # транзакции: письмо не уйдёт, если вставка откатится.
+                with transaction.atomic():
+                    user = serializer.save()
+                    self.send_code(user)
+                return Response(serializer.data, status=status.HTTP_200_OK)
+            except IntegrityError:
+                # Параллельный запрос успел зарегистрировать эту пару
+                # или занять username/email.
+                user = serializer.find_user()
+                if user is None:
+                    raise
+        self.send_code(user)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+    @staticmethod
+    def send_code(user):
+        send_verification_email(user, confirmation_codes.make_code(user))
 
 
 class UserVerificationViewSet(
-    mixins.CreateModelMixin, viewsets.GenericViewSet
+    TimedViewMixin, mixins.CreateModelMixin, viewsets.GenericViewSet
 ):
     serializer_class = TokenSerializer
 
@@ -169,7 +314,7 @@ class UserVerificationViewSet(
         return Response(serializer.validated_data)
 
 
-class UsersViewSet(viewsets.ModelViewSet):
+class UsersViewSet(TimedViewMixin, viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UsersSerializer
     permission_classes = [IsAuthenticated, IsAdmin]
@@ -178,53 +323,185 @@ class UsersViewSet(viewsets.ModelViewSet):
     lookup_field = 'username'
     http_method_names = ['get', 'post', 'patch', 'delete']
 
+    def get_current_user(self):
+        # request.user - снимок из кеша аутентификации, в нём есть только
+        # поля для проверки прав. Профиль читается из БД целиком.
+        return User.objects.get(pk=self.request.user.pk)
+
     @action(
         detail=False, methods=['get'], url_path='me',
         permission_classes=[IsAuthenticated])
     def user_information(self, request):
-        serializer = self.get_serializer(request.user)
+        serializer = self.get_serializer(self.get_current_user())
         return Response(serializer.data)
 
     @user_information.mapping.patch
     def user_update(self, request):
         serializer = UpdateUsersSerializer(
-            request.user, data=request.data, partial=True)
+            self.get_current_user(), data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
         serializer.save()
         return Response(serializer.data)
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(TimedViewMixin, AnonymousCacheMixin, TitleNestedMixin,
+                    viewsets.ModelViewSet):
     serializer_class = ReviewSerializer
     permission_classes = [
         IsAuthenticatedOrReadOnly, IsAuthorOrStaffOrReadOnly
     ]
+    pagination_class = PageNumberOrCursorPagination
+    cursor_ordering = ('-pub_date', '-id')
     http_method_names = ['get', 'post', 'patch', 'delete']
 
-    @property
-    def title_object(self):
-        return get_object_or_404(Title, id=self.kwargs['title_id'])
+    def get_version_tags(self):
+        return [title_reviews_tag(self.kwargs['title_id']), AUTHORS_TAG]
 
+    @transaction.atomic
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user, title=self.title_object)
+        # Повторный отзыв отсекает ограничение unique_review_author,
+        # отдельная проверка exists() не нужна.
+        try:
+            with transaction.atomic():
+                review = serializer.save(
+                    author=self.request.user, title=self.get_title()
+                )
+        except IntegrityError:
+            raise ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    'Может существовать только один отзыв!'
+                ]
+            })
+        apply_review_delta(review.title_id, review.score, 1)
+
+    @transaction.atomic
+    def perform_update(self, serializer):
+        old_score = serializer.instance.score
+        review = serializer.save()
+        if review.score != old_score:
+            apply_review_delta(review.title_id, review.score - old_score)
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        title_id, score = instance.title_id, instance.score
+        instance.delete()
+        apply_review_delta(title_id, -score, -1)
 
     def get_queryset(self):
-        return self.title_object.reviews.all()
+        return self.get_title().reviews.select_related('author')
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(TimedViewMixin, AnonymousCacheMixin, ReviewNestedMixin,
+                     viewsets.ModelViewSet):
     serializer_class = CommentSerializer
     permission_classes = [
         IsAuthenticatedOrReadOnly, IsAuthorOrStaffOrReadOnly
     ]
+    pagination_class = PageNumberOrCursorPagination
+    cursor_ordering = ('pub_date', 'id')
     http_method_names = ['get', 'post', 'patch', 'delete']
 
-    @property
-    def review_object(self):
-        return get_object_or_404(Review, id=self.kwargs['review_id'])
+    def get_version_tags(self):
+        return [review_comments_tag(self.kwargs['review_id']), AUTHORS_TAG]
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user, review=self.review_object)
+        serializer.save(author=self.request.user, review=self.get_review())
+
+    def get_queryset(self):
+        # 404 для несуществующего отзыва или отзыва к другому произведению.
+        self.get_review()
+        return Comment.objects.filter(
+            review_id=self.kwargs['review_id'],
+            review__title_id=self.kwargs['title_id'],
+        ).select_related('author')
+
+
+class ReviewSearchViewSet(TimedViewMixin, mixins.ListModelMixin,
+                          viewsets.GenericViewSet):
+    """Полнотекстовый поиск по отзывам всех произведений."""
+    queryset = Review.objects.select_related('author')
+    serializer_class = ReviewSearchSerializer
+    permission_classes = [IsAuthenticatedOrReadOnly]
+    pagination_class = LimitOffsetPagination
 
     def get_queryset(self):
-        return self.review_object.comments.all()
+        query = self.request.query_params.get('q')
+        if not query:
+            raise ValidationError({'q': 'Обязательный параметр.'})
+        queryset = super().get_queryset()
+        title_id = self.request.query_params.get('title')
+        if title_id:
+            if not title_id.isdigit():
+                raise ValidationError({'title': 'Ожидается id произведения.'})
+            queryset = queryset.filter(title_id=title_id)
+        return search.search_reviews(queryset, query)
+
+
+class ReviewImportViewSet(TimedViewMixin, BatchMixin, viewsets.GenericViewSet):
+    """
+    Пакетный импорт отзывов: POST со списком {title, author, score, text}.
+
+    ?on_conflict=update перезаписывает оценку и текст существующих
+    отзывов автора, по умолчанию (ignore) такие строки пропускаются.
+    """
+    serializer_class = ReviewImportSerializer
+    permission_classes = [IsAuthenticated, IsAdmin]
+
+    def create(self, request):
+        items = self.get_batch(request)
+        on_conflict = request.query_params.get('on_conflict', 'ignore')
+        if on_conflict not in ('ignore', 'update'):
+            raise ValidationError(
+                {'on_conflict': 'Допустимые значения: ignore, update.'})
+        serializer = self.get_serializer()
+        results = [None] * len(items)
+        rows, positions = [], []
+        for index, item in enumerate(items):
+            try:
+                rows.append(serializer.run_validation(item))
+            except ValidationError as error:
+                results[index] = {'errors': error.detail}
+            else:
+                positions.append(index)
+        reviews = build_reviews(rows) if rows else []
+        valid = [review for review in reviews if isinstance(review, Review)]
+        outcomes = {}
+        if valid:
+            imported = import_reviews(valid, update=on_conflict == 'update')
+            outcomes = {
+                id(review): outcome
+                for outcome, group in imported._asdict().items()
+                for review in group
+            }
+        for index, review in zip(positions, reviews):
+            results[index] = (
+                {'result': outcomes[id(review)]}
+                if isinstance(review, Review) else {'errors': review}
+            )
+        return self.batch_response(results, len(valid))
+
+
+class LeaderboardViewSet(TimedViewMixin, AnonymousCacheMixin,
+                         mixins.ListModelMixin, viewsets.GenericViewSet):
+    """
+    Произведения по убыванию взвешенной оценки (reviews.leaderboards).
+
+    Список читается по индексу (board, -score, title) без сортировки.
+    """
+    queryset = (
+        LeaderboardEntry.objects
+        .filter(score__isnull=False)
+        .select_related('title__category')
+        .prefetch_related(
+            Prefetch('title__genre', queryset=Genre.objects.order_by())
+        )
+        .order_by('-score', 'title_id')
+    )
+    serializer_class = LeaderboardEntrySerializer
+    permission_classes = [IsAuthenticatedOrReadOnly]
+    pagination_class = LimitOffsetPagination
+    filter_backends = (LeaderboardFilter,)
+
+    def get_version_tags(self):
+        # Оценки меняются вместе с рейтингом произведений.
+        return [taxonomy.TAG, TITLES_TAG]
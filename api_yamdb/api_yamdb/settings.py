@@ -1,4 +1,4 @@
-from datetime import timedelta
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
 
@@ -31,7 +31,7 @@ INSTALLED_APPS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 5,
@@ -39,6 +39,11 @@ REST_FRAMEWORK = {
 
 AUTH_USER_MODEL = 'reviews.ReviewsUser'
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+# Срок действия кода подтверждения, секунд.
+CONFIRMATION_CODE_TIMEOUT = 60 * 60 * 24
+# До этого момента принимаются коды, сохранённые в user.code до перехода
+# на HMAC (неделя на ещё не открытые письма); None - не принимаются.
+LEGACY_CONFIRMATION_CODES_UNTIL = datetime(2026, 10, 26, tzinfo=timezone.utc)
 
 
 SIMPLE_JWT = {
@@ -47,6 +52,7 @@ SIMPLE_JWT = {
 }
 
 MIDDLEWARE = [
+    'api_yamdb.timing.RequestTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -56,6 +62,48 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Замер запросов к БД и фаз обработки запроса (заголовок Server-Timing).
+REQUEST_TIMING = {
+    'ENABLED': False,
+    'SAMPLE_RATE': 1.0,
+    'SLOW_REQUEST_MS': 500,
+    'SLOW_SQL_LIMIT': 5,
+}
+
+# Кеш ответов для анонимных GET-запросов каталога (api.mixins). Между
+# процессами он общий, только если общий сам бэкенд ALIAS из CACHES.
+RESPONSE_CACHE = {
+    'ENABLED': True,
+    'ALIAS': 'responses',
+    'TIMEOUT': 60 * 5,
+}
+
+# Материализованные рейтинги (reviews.leaderboards): взвешенная оценка
+# тянется к PRIOR_MEAN, пока отзывов меньше MIN_REVIEWS.
+LEADERBOARDS = {
+    'MIN_REVIEWS': 5,
+    'PRIOR_MEAN': 5.5,
+}
+
+# Очередь исходящих писем (reviews.outbox, команда send_outbox).
+EMAIL_OUTBOX = {
+    'EAGER': False,
+    'BATCH_SIZE': 100,
+    'MAX_ATTEMPTS': 5,
+    'BACKOFF_SECONDS': 60,
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'api_yamdb.timing': {'handlers': ['console'], 'level': 'INFO'},
+    },
+}
+
 ROOT_URLCONF = 'api_yamdb.urls'
 
 TEMPLATES_DIR = BASE_DIR / 'templates'
@@ -87,6 +135,31 @@ DATABASES = {
     }
 }
 
+# Счётчики версий (reviews.versions), снимки пользователей и кеш ответов
+# должны быть общими для всех процессов: LocMemCache у каждого процесса
+# свой, и изменение, сделанное в одном, другие не увидят. Файловый кеш
+# не требует отдельного сервиса; для нескольких машин нужен Memcached
+# или Redis. Счётчики лежат отдельно и не вытесняются: иначе частые
+# записи кеша ответов выбрасывали бы их и сбрасывали все кеши разом.
+CACHE_DIR = BASE_DIR / 'cache'
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': CACHE_DIR / 'default',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+    'versions': {
+        'BACKEND': 'reviews.cache.UnculledFileBasedCache',
+        'LOCATION': CACHE_DIR / 'versions',
+    },
+    'responses': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': CACHE_DIR / 'responses',
+        'OPTIONS': {'MAX_ENTRIES': 2000},
+    },
+}
+VERSION_CACHE_ALIAS = 'versions'
+
 
 # Password validation
 
@@ -0,0 +1,141 @@
+"""
+Замер времени обработки запроса по фазам.
+
+RequestTimingMiddleware считает запросы к БД и их длительность через
+connection.execute_wrapper, а фазы view/auth/perm/serialize отмечаются в
+коде контекстным менеджером phase(); view включает остальные фазы. Итог
+отдаётся в заголовке Server-Timing и пишется в лог одной JSON-строкой.
+Если замер выключен, middleware не подключается, а phase() сводится к
+чтению contextvar.
+"""
+import heapq
+import json
+import logging
+import random
+import time
+from collections import defaultdict
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ENABLED': False,
+    'SAMPLE_RATE': 1.0,
+    'SLOW_REQUEST_MS': 500,
+    'SLOW_SQL_LIMIT': 5,
+}
+
+_current = ContextVar('request_timing', default=None)
+
+
+class RequestTiming:
+    def __init__(self, slow_sql_limit):
+        self.phases = defaultdict(float)
+        self.active = set()
+        self.queries = 0
+        self.db_time = 0.0
+        self.slow_sql_limit = slow_sql_limit
+        self.slow_sql = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.queries += 1
+            self.db_time += duration
+            # Храним только самые долгие запросы: память не растёт
+            # с числом запросов.
+            entry = (duration, self.queries, sql)
+            if len(self.slow_sql) < self.slow_sql_limit:
+                heapq.heappush(self.slow_sql, entry)
+            elif self.slow_sql and entry > self.slow_sql[0]:
+                heapq.heapreplace(self.slow_sql, entry)
+
+
+@contextmanager
+def phase(name):
+    """Добавляет время блока к фазе name текущего запроса."""
+    timing = _current.get()
+    # Вложенные вызовы одной фазы (сериализатор внутри сериализатора)
+    # не учитываются повторно.
+    if timing is None or name in timing.active:
+        yield
+        return
+    timing.active.add(name)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing.phases[name] += time.perf_counter() - started
+        timing.active.discard(name)
+
+
+class RequestTimingMiddleware:
+    def __init__(self, get_response):
+        config = {**DEFAULTS, **getattr(settings, 'REQUEST_TIMING', {})}
+        if not config['ENABLED']:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = config['SAMPLE_RATE']
+        self.slow_request_ms = config['SLOW_REQUEST_MS']
+        self.slow_sql_limit = config['SLOW_SQL_LIMIT']
+
+    def __call__(self, request):
+        if random.random() >= self.sample_rate:
+            return self.get_response(request)
+        timing = RequestTiming(self.slow_sql_limit)
+        token = _current.set(timing)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(timing))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        total_ms = (time.perf_counter() - started) * 1000
+        response['Server-Timing'] = self.server_timing(timing, total_ms)
+        self.log(request, response, timing, total_ms)
+        return response
+
+    @staticmethod
+    def server_timing(timing, total_ms):
+        metrics = [
+            f'db;dur={timing.db_time * 1000:.1f};'
+            f'desc="{timing.queries} queries"'
+        ]
+        metrics.extend(
+            f'{name};dur={duration * 1000:.1f}'
+            for name, duration in timing.phases.items()
+        )
+        metrics.append(f'total;dur={total_ms:.1f}')
+        return ', '.join(metrics)
+
+    def log(self, request, response, timing, total_ms):
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'total_ms': round(total_ms, 1),
+            'db_ms': round(timing.db_time * 1000, 1),
+            'queries': timing.queries,
+            **{
+                f'{name}_ms': round(duration * 1000, 1)
+                for name, duration in timing.phases.items()
+            },
+        }
+        if total_ms < self.slow_request_ms:
+            logger.info(json.dumps(record))
+            return
+        record['slow_sql'] = [
+            {'ms': round(duration * 1000, 1), 'sql': sql}
+            for duration, _, sql in sorted(timing.slow_sql, reverse=True)
+        ]
+        logger.warning(json.dumps(record, ensure_ascii=False))
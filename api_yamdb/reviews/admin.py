@@ -1,8 +1,9 @@
 from django.contrib import admin
 from .models import (
-    Category, Comment, Genre, GenreTitle,
+    Category, Comment, EmailOutbox, Genre, GenreTitle,
     ReviewsUser, Review, Title
 )
+from .ratings import rebuild_ratings
 
 
 @admin.register(Category)
@@ -53,6 +54,22 @@ class ReviewAdmin(admin.ModelAdmin):
     list_filter = ('score', 'pub_date')
     ordering = ('-pub_date',)
 
+    def save_model(self, request, obj, form, change):
+        title_ids = {obj.title_id}
+        if change and 'title' in form.changed_data:
+            title_ids.add(form.initial['title'])
+        super().save_model(request, obj, form, change)
+        rebuild_ratings(title_ids)
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        rebuild_ratings([obj.title_id])
+
+    def delete_queryset(self, request, queryset):
+        title_ids = set(queryset.values_list('title_id', flat=True))
+        super().delete_queryset(request, queryset)
+        rebuild_ratings(title_ids)
+
 
 @admin.register(Comment)
 class CommentAdmin(admin.ModelAdmin):
@@ -60,3 +77,12 @@ class CommentAdmin(admin.ModelAdmin):
     search_fields = ('review__text', 'author__username', 'text')
     list_filter = ('pub_date',)
     ordering = ('pub_date',)
+
+
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+    list_display = (
+        'id', 'to', 'subject', 'attempts', 'next_attempt_at', 'sent_at'
+    )
+    search_fields = ('to', 'subject')
+    readonly_fields = ('created_at', 'sent_at', 'last_error')
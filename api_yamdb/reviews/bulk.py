@@ -0,0 +1,144 @@
+"""Пакетная вставка произведений и отзывов в обход сигналов моделей."""
+from collections import namedtuple
+
+from django.db import connection, transaction
+
+from . import leaderboards
+from .models import GenreTitle, Review, ReviewsUser, Title
+from .ratings import rebuild_ratings
+from .versions import (
+    TITLES_TAG, bump_version_on_commit, title_reviews_tag
+)
+
+ImportResult = namedtuple('ImportResult', 'created updated skipped')
+
+
+def fill_ids(model, objs):
+    """
+    Проставляет id объектам после bulk_create, если БД их не вернула.
+
+    Вызывается в той же транзакции, что и вставка: пока она открыта,
+    SQLite не пускает других писателей, а AUTOINCREMENT выдаёт id
+    подряд, поэтому новые строки - последние len(objs) id таблицы.
+    """
+    if not objs or objs[-1].pk is not None:
+        return
+    ids = list(
+        model.objects
+        .order_by('-pk')
+        .values_list('pk', flat=True)[:len(objs)]
+    )
+    for obj, pk in zip(objs, reversed(ids)):
+        obj.pk = pk
+
+
+def bulk_create_titles(titles, genres, batch_size=None):
+    """
+    Вставляет произведения и их связи с жанрами в одной транзакции.
+
+    genres - списки жанров в порядке titles. Сигналы моделей при
+    bulk_create не срабатывают, поэтому строки рейтингов создаются и
+    версия списка произведений увеличивается здесь; поисковый индекс
+    обновляют триггеры БД.
+    """
+    with transaction.atomic():
+        Title.objects.bulk_create(titles, batch_size)
+        if connection.vendor == 'sqlite':
+            fill_ids(Title, titles)
+        GenreTitle.objects.bulk_create(
+            [
+                GenreTitle(title_id=title.pk, genre_id=genre.pk)
+                for title, title_genres in zip(titles, genres)
+                for genre in title_genres
+            ],
+            batch_size,
+        )
+        leaderboards.add_titles(titles, genres)
+        bump_version_on_commit(TITLES_TAG)
+    return titles
+
+
+def build_reviews(rows):
+    """
+    Отзывы из словарей с title (id), author (username), score и text.
+
+    Произведения и авторы всего пакета ищутся двумя запросами. Вместо
+    отзыва с неизвестным произведением или автором в списке будет
+    словарь ошибок по полям.
+    """
+    title_ids = set(
+        Title.objects.filter(pk__in={row['title'] for row in rows})
+        .values_list('pk', flat=True)
+    )
+    authors = dict(
+        ReviewsUser.objects
+        .filter(username__in={row['author'] for row in rows})
+        .values_list('username', 'pk')
+    )
+    reviews = []
+    for row in rows:
+        errors = {}
+        if row['title'] not in title_ids:
+            errors['title'] = [f'Произведение {row["title"]} не найдено.']
+        if row['author'] not in authors:
+            errors['author'] = [f'Пользователь {row["author"]} не найден.']
+        reviews.append(errors or Review(
+            title_id=row['title'],
+            author_id=authors[row['author']],
+            score=row['score'],
+            text=row['text'],
+        ))
+    return reviews
+
+
+def import_reviews(reviews, update=False, batch_size=None):
+    """
+    Сохраняет пакет отзывов и один раз пересчитывает рейтинг.
+
+    Пара произведение-автор уникальна (unique_review_author): уже
+    сохранённый отзыв пропускается, а с update=True получает оценку и
+    текст из пакета (если они отличаются: bulk_update дорог). Из
+    повторов пары внутри пакета остаётся первый, с update=True -
+    последний. Возвращает ImportResult со списками
+    созданных, обновлённых и пропущенных объектов из reviews.
+    """
+    latest = {}
+    for review in reviews:
+        key = (review.title_id, review.author_id)
+        if update or key not in latest:
+            latest[key] = review
+    with transaction.atomic():
+        existing = {
+            (title_id, author_id): (pk, score, text)
+            for pk, title_id, author_id, score, text in Review.objects.filter(
+                title_id__in={title_id for title_id, _ in latest},
+                author_id__in={author_id for _, author_id in latest},
+            ).values_list('pk', 'title_id', 'author_id', 'score', 'text')
+        }
+        created, updated = [], []
+        for key, review in latest.items():
+            if key not in existing:
+                created.append(review)
+                continue
+            pk, score, text = existing[key]
+            if update and (review.score, review.text) != (score, text):
+                review.pk = pk
+                updated.append(review)
+        # Отзыв, вставленный параллельно после чтения existing, не
+        # должен ронять весь пакет.
+        Review.objects.bulk_create(
+            created, batch_size, ignore_conflicts=True
+        )
+        if updated:
+            Review.objects.bulk_update(
+                updated, ['score', 'text'], batch_size
+            )
+        title_ids = {review.title_id for review in created + updated}
+        if title_ids:
+            rebuild_ratings(title_ids)
+            bump_version_on_commit(
+                *(title_reviews_tag(title_id) for title_id in title_ids)
+            )
+    saved = {id(review) for review in created + updated}
+    skipped = [review for review in reviews if id(review) not in saved]
+    return ImportResult(created, updated, skipped)
@@ -0,0 +1,15 @@
+from django.core.cache.backends.filebased import FileBasedCache
+
+
+class UnculledFileBasedCache(FileBasedCache):
+    """
+    Файловый кеш без вытеснения для счётчиков версий (reviews.versions).
+
+    FileBasedCache перед каждой записью перечисляет все файлы папки и при
+    MAX_ENTRIES удаляет случайные записи. Потерянный счётчик сбрасывает
+    все кеши, которые от него зависят, а счётчиков немного по объёму,
+    поэтому здесь записи не вытесняются и папка не перечисляется.
+    """
+
+    def _cull(self):
+        pass
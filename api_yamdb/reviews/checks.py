@@ -0,0 +1,28 @@
+from django.core.checks import Tags, Warning, register
+
+from django.core.cache import DEFAULT_CACHE_ALIAS
+
+from .versions import get_cache_alias, is_shared_cache
+
+
+@register(Tags.caches)
+def check_version_cache(app_configs, **kwargs):
+    # default хранит снимки пользователей api.authentication.
+    local = [
+        alias for alias in dict.fromkeys(
+            (get_cache_alias(), DEFAULT_CACHE_ALIAS)
+        )
+        if not is_shared_cache(alias)
+    ]
+    if not local:
+        return []
+    return [Warning(
+        f'Кеш {", ".join(local)} виден только своему процессу: другие '
+        'процессы не узнают об изменении версий (reviews.versions) и '
+        'отдают устаревшие данные.',
+        hint=(
+            'Укажите в CACHES общий бэкенд: FileBasedCache, DatabaseCache, '
+            'Memcached или Redis.'
+        ),
+        id='reviews.W001',
+    )]
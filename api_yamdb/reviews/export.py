@@ -0,0 +1,152 @@
+"""
+Потоковая выгрузка каталога.
+
+Данные читаются серверными курсорами (`iterator`) в виде кортежей
+`values_list` без создания экземпляров моделей, поэтому расход памяти
+не зависит от числа строк. CSV повторяет формат static/data и
+загружается обратно командой load_csv.
+"""
+import csv
+import json
+
+from .models import (
+    Category, Comment, Genre, GenreTitle, Review, ReviewsUser, Title
+)
+
+CHUNK_SIZE = 2000
+
+# Файл -> (модель, [(заголовок столбца, поле)]).
+CSV_TABLES = {
+    'users.csv': (ReviewsUser, (
+        ('id', 'id'), ('username', 'username'), ('email', 'email'),
+        ('role', 'role'), ('bio', 'bio'), ('first_name', 'first_name'),
+        ('last_name', 'last_name'),
+    )),
+    'category.csv': (Category, (
+        ('id', 'id'), ('name', 'name'), ('slug', 'slug'),
+    )),
+    'genre.csv': (Genre, (
+        ('id', 'id'), ('name', 'name'), ('slug', 'slug'),
+    )),
+    'titles.csv': (Title, (
+        ('id', 'id'), ('name', 'name'), ('year', 'year'),
+        ('category', 'category_id'), ('description', 'description'),
+    )),
+    'genre_title.csv': (GenreTitle, (
+        ('id', 'id'), ('title_id', 'title_id'), ('genre_id', 'genre_id'),
+    )),
+    'review.csv': (Review, (
+        ('id', 'id'), ('title_id', 'title_id'), ('text', 'text'),
+        ('author', 'author_id'), ('score', 'score'),
+        ('pub_date', 'pub_date'),
+    )),
+    'comments.csv': (Comment, (
+        ('id', 'id'), ('review_id', 'review_id'), ('text', 'text'),
+        ('author', 'author_id'), ('pub_date', 'pub_date'),
+    )),
+}
+
+
+class Echo:
+    """Файлоподобный объект: csv.writer возвращает готовую строку."""
+
+    def write(self, value):
+        return value
+
+
+def format_datetime(value):
+    return value.isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+
+
+def format_value(value):
+    if value is None:
+        return ''
+    if hasattr(value, 'isoformat'):
+        return format_datetime(value)
+    return value
+
+
+def iter_csv(filename, chunk_size=CHUNK_SIZE):
+    model, columns = CSV_TABLES[filename]
+    writer = csv.writer(Echo())
+    yield writer.writerow([header for header, _ in columns])
+    rows = (
+        model.objects
+        .order_by('id')
+        .values_list(*(field for _, field in columns))
+        .iterator(chunk_size=chunk_size)
+    )
+    for row in rows:
+        yield writer.writerow([format_value(value) for value in row])
+
+
+class GroupedRows:
+    """
+    Строки, отсортированные по id произведения, выдаются группами.
+
+    Позволяет слить несколько потоков с выгрузкой произведений без
+    загрузки связанных таблиц в память.
+    """
+
+    def __init__(self, rows):
+        self.rows = iter(rows)
+        self.head = next(self.rows, None)
+
+    def take(self, title_id):
+        while self.head is not None and self.head[0] < title_id:
+            self.head = next(self.rows, None)
+        group = []
+        while self.head is not None and self.head[0] == title_id:
+            group.append(self.head[1:])
+            self.head = next(self.rows, None)
+        return group
+
+
+def iter_ndjson(chunk_size=CHUNK_SIZE):
+    """Одна JSON-строка на произведение вместе с жанрами и отзывами."""
+    titles = (
+        Title.objects
+        .order_by('id')
+        .values_list(
+            'id', 'name', 'year', 'description', 'category__slug', 'rating'
+        )
+        .iterator(chunk_size=chunk_size)
+    )
+    genres = GroupedRows(
+        GenreTitle.objects
+        .filter(genre__isnull=False)
+        .order_by('title_id', 'genre_id')
+        .values_list('title_id', 'genre__slug')
+        .iterator(chunk_size=chunk_size)
+    )
+    reviews = GroupedRows(
+        Review.objects
+        .order_by('title_id', 'id')
+        .values_list(
+            'title_id', 'id', 'author__username', 'text', 'score',
+            'pub_date'
+        )
+        .iterator(chunk_size=chunk_size)
+    )
+    for title_id, name, year, description, category, rating in titles:
+        line = {
+            'id': title_id,
+            'name': name,
+            'year': year,
+            'description': description,
+            'category': category,
+            'genre': [slug for slug, in genres.take(title_id)],
+            'rating': rating,
+            'reviews': [
+                {
+                    'id': review_id,
+                    'author': author,
+                    'text': text,
+                    'score': score,
+                    'pub_date': format_datetime(pub_date),
+                }
+                for review_id, author, text, score, pub_date
+                in reviews.take(title_id)
+            ],
+        }
+        yield json.dumps(line, ensure_ascii=False) + '\n'
@@ -0,0 +1,228 @@
+"""
+Материализованные рейтинги произведений.
+
+LeaderboardEntry хранит взвешенную оценку каждого произведения в
+списках all, year:<год>, category:<id>, category:<id>:year:<год> и
+genre:<id>. Оценка - байесовское среднее
+(score_sum + m * C) / (reviews_count + m): пока отзывов меньше
+MIN_REVIEWS (m), она тянется к PRIOR_MEAN (C), и произведение с
+единственной десяткой не обгоняет проверенные. У произведения без
+отзывов оценка NULL, в выдачу оно не попадает.
+
+Строки создаются вместе с произведением, а оценку при изменении
+счётчиков Title переносит триггер БД (SQLite, PostgreSQL; ставится
+после migrate, см. reviews.signals), так что отзыв не добавляет
+запросов. На других СУБД оценка обновляется из update_scores. C
+задаётся настройкой, а не считается по каталогу: иначе каждый отзыв
+сдвигал бы оценки всех произведений. Команда rebuild_leaderboards
+показывает текущую среднюю оценку.
+"""
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import (
+    Case, F, FloatField, OuterRef, Q, Subquery, Sum, Value, When
+)
+from django.db.models.functions import Cast
+
+from .models import GenreTitle, LeaderboardEntry, Title
+
+DEFAULTS = {
+    'MIN_REVIEWS': 5,
+    # Середина шкалы оценок 1-10.
+    'PRIOR_MEAN': 5.5,
+}
+ALL_BOARD = 'all'
+CHUNK_SIZE = 500
+TRIGGER = 'reviews_title_leaderboard_au'
+TRIGGER_VENDORS = ('sqlite', 'postgresql')
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'LEADERBOARDS', {})}
+
+
+def board_key(category_id=None, genre_id=None, year=None):
+    """Ключ списка; жанр не сочетается с другими условиями."""
+    if genre_id is not None:
+        return f'genre:{genre_id}'
+    parts = []
+    if category_id is not None:
+        parts.append(f'category:{category_id}')
+    if year is not None:
+        parts.append(f'year:{year}')
+    return ':'.join(parts) or ALL_BOARD
+
+
+def title_boards(category_id, year, genre_ids):
+    boards = [ALL_BOARD, board_key(year=year)]
+    if category_id is not None:
+        boards += [
+            board_key(category_id=category_id),
+            board_key(category_id=category_id, year=year),
+        ]
+    boards += [board_key(genre_id=genre_id) for genre_id in genre_ids]
+    return boards
+
+
+def catalog_mean():
+    """Средняя оценка всех отзывов каталога или None."""
+    totals = Title.objects.aggregate(
+        score_sum=Sum('score_sum'), reviews_count=Sum('reviews_count')
+    )
+    if not totals['reviews_count']:
+        return None
+    return totals['score_sum'] / totals['reviews_count']
+
+
+def weighted_score():
+    """Взвешенная оценка по счётчикам Title в виде выражения SQL."""
+    config = get_config()
+    min_reviews = config['MIN_REVIEWS']
+    return Case(
+        When(reviews_count=0, then=Value(None)),
+        default=(
+            Cast('score_sum', FloatField())
+            + Value(min_reviews * config['PRIOR_MEAN'])
+        ) / (F('reviews_count') + Value(min_reviews)),
+        output_field=FloatField(),
+    )
+
+
+def score_sql(row):
+    """weighted_score() на SQL для строки Title в триггере."""
+    config = get_config()
+    min_reviews = float(config['MIN_REVIEWS'])
+    return (
+        f'CASE WHEN {row}.reviews_count = 0 THEN NULL ELSE '
+        f'({row}.score_sum + {min_reviews * config["PRIOR_MEAN"]!r}) / '
+        f'({row}.reviews_count + {min_reviews!r}) END'
+    )
+
+
+def install(using='default'):
+    """
+    Пересоздаёт триггер оценок: MIN_REVIEWS и PRIOR_MEAN подставляются
+    в его SQL, поэтому он ставится заново после каждого migrate.
+    """
+    vendor = connections[using].vendor
+    if vendor not in TRIGGER_VENDORS:
+        return
+    titles = Title._meta.db_table
+    update = (
+        f'UPDATE {LeaderboardEntry._meta.db_table} '
+        f'SET score = {score_sql("NEW")} WHERE title_id = NEW.id;'
+    )
+    event = f'AFTER UPDATE OF score_sum, reviews_count ON {titles}'
+    with connections[using].cursor() as cursor:
+        if vendor == 'sqlite':
+            cursor.execute(f'DROP TRIGGER IF EXISTS {TRIGGER}')
+            cursor.execute(
+                f'CREATE TRIGGER {TRIGGER} {event} BEGIN {update} END'
+            )
+            return
+        cursor.execute(
+            f'CREATE OR REPLACE FUNCTION {TRIGGER}() RETURNS trigger AS '
+            f'$$ BEGIN {update} RETURN NULL; END $$ LANGUAGE plpgsql'
+        )
+        cursor.execute(f'DROP TRIGGER IF EXISTS {TRIGGER} ON {titles}')
+        cursor.execute(
+            f'CREATE TRIGGER {TRIGGER} {event} FOR EACH ROW '
+            f'EXECUTE PROCEDURE {TRIGGER}()'
+        )
+
+
+def refresh_titles(title_ids):
+    """
+    Пересобирает строки произведений во всех списках.
+
+    Четыре запроса на пачку из CHUNK_SIZE произведений.
+    """
+    title_ids = list(title_ids)
+    for start in range(0, len(title_ids), CHUNK_SIZE):
+        _refresh_chunk(title_ids[start:start + CHUNK_SIZE])
+
+
+def _refresh_chunk(title_ids):
+    titles = (
+        Title.objects
+        .filter(pk__in=title_ids)
+        .order_by()
+        .annotate(weighted=weighted_score())
+        .values_list('pk', 'category_id', 'year', 'weighted')
+    )
+    genres = defaultdict(list)
+    # Связь с удалённым жанром остаётся с genre_id = NULL (SET_NULL).
+    for title_id, genre_id in GenreTitle.objects.filter(
+        title_id__in=title_ids, genre_id__isnull=False
+    ).values_list('title_id', 'genre_id'):
+        genres[title_id].append(genre_id)
+    entries = [
+        LeaderboardEntry(board=board, title_id=pk, score=score)
+        for pk, category_id, year, score in titles
+        for board in title_boards(category_id, year, genres[pk])
+    ]
+    LeaderboardEntry.objects.filter(title_id__in=title_ids).delete()
+    LeaderboardEntry.objects.bulk_create(entries)
+
+
+def add_titles(titles, genres):
+    """
+    Вносит в списки только что созданные произведения без отзывов.
+
+    genres - списки жанров в порядке titles; БД не перечитывается.
+    """
+    LeaderboardEntry.objects.bulk_create([
+        LeaderboardEntry(board=board, title_id=title.pk)
+        for title, title_genres in zip(titles, genres)
+        for board in title_boards(
+            title.category_id, title.year,
+            [genre.pk for genre in title_genres]
+        )
+    ])
+
+
+def refresh_titles_on_commit(title_ids):
+    """
+    refresh_titles после коммита: каскадное удаление произведения шлёт
+    сигналы GenreTitle, пока само произведение ещё не удалено.
+    """
+    title_ids = list(title_ids)
+
+    def refresh():
+        with transaction.atomic():
+            refresh_titles(title_ids)
+
+    transaction.on_commit(refresh)
+
+
+def update_scores(title_ids, using='default'):
+    """
+    Пересчитывает оценки после изменения счётчиков Title там, где это
+    не делает триггер.
+    """
+    if connections[using].vendor in TRIGGER_VENDORS:
+        return
+    LeaderboardEntry.objects.using(using).filter(
+        title_id__in=list(title_ids)
+    ).update(score=Subquery(
+        Title.objects.filter(pk=OuterRef('title_id'))
+        .order_by()
+        .annotate(weighted=weighted_score())
+        .values('weighted')[:1]
+    ))
+
+
+def rebuild():
+    """Пересобирает все списки и триггер оценок."""
+    install()
+    LeaderboardEntry.objects.all().delete()
+    refresh_titles(Title.objects.order_by('pk').values_list('pk', flat=True))
+
+
+def drop_board(board):
+    """Удаляет список вместе с вложенными (category:<id>:year:<год>)."""
+    LeaderboardEntry.objects.filter(
+        Q(board=board) | Q(board__startswith=f'{board}:')
+    ).delete()
@@ -0,0 +1,60 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.export import CHUNK_SIZE, CSV_TABLES, iter_csv, iter_ndjson
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоково выгружает каталог: NDJSON (произведение с жанрами и '
+        'отзывами на строку) или CSV в формате static/data.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--format', dest='output_format', default='ndjson',
+            choices=('ndjson', 'csv'),
+        )
+        parser.add_argument(
+            '--output',
+            help=(
+                'Файл для NDJSON или каталог для CSV. Без него NDJSON '
+                'пишется в stdout.'
+            )
+        )
+        parser.add_argument(
+            '--table', choices=sorted(CSV_TABLES),
+            help='Выгрузить в CSV только одну таблицу.'
+        )
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        output = options['output']
+        if options['output_format'] == 'ndjson':
+            self.write(iter_ndjson(chunk_size), output)
+            return
+        tables = [options['table']] if options['table'] else CSV_TABLES
+        if output is None:
+            if len(tables) > 1:
+                raise CommandError(
+                    'Для выгрузки всех таблиц в CSV укажите каталог --output.'
+                )
+            self.write(iter_csv(tables[0], chunk_size), None)
+            return
+        os.makedirs(output, exist_ok=True)
+        for filename in tables:
+            self.write(
+                iter_csv(filename, chunk_size),
+                os.path.join(output, filename)
+            )
+
+    def write(self, lines, path):
+        if path is None:
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+        with open(path, 'w', encoding='utf-8', newline='') as output:
+            output.writelines(lines)
+        self.stderr.write(f'Записан файл {path}.')
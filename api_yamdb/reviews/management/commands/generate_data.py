@@ -0,0 +1,96 @@
+import csv
+import os
+from datetime import datetime, timedelta, timezone
+
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.export import format_datetime
+
+START_DATE = datetime(2020, 1, 1, tzinfo=timezone.utc)
+ROLES = ('user', 'user', 'user', 'moderator', 'admin')
+
+
+class Command(BaseCommand):
+    help = (
+        'Генерирует синтетические CSV в формате static/data для нагрузочных '
+        'тестов. Строки пишутся потоком, загрузка - командой load_csv.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help='Каталог для CSV-файлов.')
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--categories', type=int, default=10)
+        parser.add_argument('--genres', type=int, default=20)
+        parser.add_argument('--titles', type=int, default=1000)
+        parser.add_argument('--reviews', type=int, default=10000)
+        parser.add_argument('--comments', type=int, default=20000)
+
+    def handle(self, *args, **options):
+        counts = {
+            name: options[name]
+            for name in (
+                'users', 'categories', 'genres', 'titles', 'reviews',
+                'comments'
+            )
+        }
+        if min(counts.values()) < 1:
+            raise CommandError('Все количества должны быть больше нуля.')
+        titles = counts['titles']
+        # Отзыв i пишет пользователь i // titles на произведение
+        # i % titles: пара (произведение, автор) не повторяется.
+        counts['users'] = max(
+            counts['users'], -(-counts['reviews'] // titles)
+        )
+        os.makedirs(options['output'], exist_ok=True)
+        self.output = options['output']
+
+        self.write('users.csv', (
+            'id', 'username', 'email', 'role', 'bio', 'first_name',
+            'last_name'
+        ), (
+            (pk, f'user{pk}', f'user{pk}@yamdb.fake',
+             ROLES[pk % len(ROLES)], '', '', '')
+            for pk in range(1, counts['users'] + 1)
+        ))
+        for filename, name in (
+            ('category.csv', 'categories'), ('genre.csv', 'genres')
+        ):
+            self.write(filename, ('id', 'name', 'slug'), (
+                (pk, f'{name} {pk}', f'{name}-{pk}')
+                for pk in range(1, counts[name] + 1)
+            ))
+        self.write('titles.csv', ('id', 'name', 'year', 'category'), (
+            (pk, f'Произведение {pk}', 1900 + pk % 120,
+             pk % counts['categories'] + 1)
+            for pk in range(1, titles + 1)
+        ))
+        genres_per_title = min(2, counts['genres'])
+        self.write('genre_title.csv', ('id', 'title_id', 'genre_id'), (
+            (i + 1, i // genres_per_title + 1,
+             (i // genres_per_title * 7 + i % genres_per_title)
+             % counts['genres'] + 1)
+            for i in range(titles * genres_per_title)
+        ))
+        self.write('review.csv', (
+            'id', 'title_id', 'text', 'author', 'score', 'pub_date'
+        ), (
+            (pk, i % titles + 1, f'Отзыв {pk}', i // titles + 1,
+             pk % 10 + 1, format_datetime(START_DATE + timedelta(minutes=pk)))
+            for i, pk in enumerate(range(1, counts['reviews'] + 1))
+        ))
+        self.write('comments.csv', (
+            'id', 'review_id', 'text', 'author', 'pub_date'
+        ), (
+            (pk, pk % counts['reviews'] + 1, f'Комментарий {pk}',
+             pk % counts['users'] + 1,
+             format_datetime(START_DATE + timedelta(minutes=pk)))
+            for pk in range(1, counts['comments'] + 1)
+        ))
+
+    def write(self, filename, header, rows):
+        path = os.path.join(self.output, filename)
+        with open(path, 'w', encoding='utf-8', newline='') as csv_file:
+            writer = csv.writer(csv_file)
+            writer.writerow(header)
+            writer.writerows(rows)
+        self.stdout.write(f'Записан файл {path}.')
@@ -0,0 +1,104 @@
+import csv
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.bulk import build_reviews, import_reviews
+from reviews.models import Review
+
+
+def parse_row(row):
+    """Строка CSV в словарь для build_reviews или текст ошибки."""
+    try:
+        title_id = int(row['title_id'])
+        score = int(row['score'])
+    except (TypeError, ValueError):
+        return 'title_id и score должны быть целыми числами'
+    if not 1 <= score <= 10:
+        return 'score должен быть от 1 до 10'
+    if not row['author'] or not row['text']:
+        return 'author и text обязательны'
+    return {
+        'title': title_id, 'author': row['author'],
+        'score': score, 'text': row['text'],
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        'Импортирует отзывы из CSV с колонками title_id, author '
+        '(username), score, text. Каждая пачка сохраняется через '
+        'bulk_create, рейтинг затронутых произведений пересчитывается '
+        'один раз на пачку.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV-файл с отзывами.')
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Количество строк в одной транзакции.'
+        )
+        parser.add_argument(
+            '--on-conflict', choices=('ignore', 'update'), default='ignore',
+            help='Что делать с уже существующим отзывом автора: '
+                 'пропустить (по умолчанию) или обновить оценку и текст.'
+        )
+
+    def handle(self, *args, **options):
+        self.batch_size = options['batch_size']
+        if self.batch_size < 1:
+            raise CommandError('--batch-size должен быть больше нуля.')
+        self.update = options['on_conflict'] == 'update'
+        self.totals = dict.fromkeys(
+            ('created', 'updated', 'skipped', 'errors'), 0
+        )
+        started = time.monotonic()
+        with open(options['path'], encoding='utf-8',
+                  newline='') as csv_file:
+            reader = csv.DictReader(csv_file)
+            missing = {'title_id', 'author', 'score', 'text'} - set(
+                reader.fieldnames or ()
+            )
+            if missing:
+                raise CommandError(
+                    f'В файле нет колонок: {", ".join(sorted(missing))}.'
+                )
+            batch = []
+            for row in reader:
+                batch.append((reader.line_num, parse_row(row)))
+                if len(batch) >= self.batch_size:
+                    self.import_batch(batch)
+                    batch = []
+            if batch:
+                self.import_batch(batch)
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано {self.totals["created"]}, обновлено '
+            f'{self.totals["updated"]}, пропущено {self.totals["skipped"]}, '
+            f'ошибок {self.totals["errors"]} за {elapsed:.2f} с.'
+        ))
+
+    def import_batch(self, batch):
+        lines = [line for line, row in batch if isinstance(row, dict)]
+        reviews = build_reviews(
+            [row for _, row in batch if isinstance(row, dict)]
+        )
+        for line, row in batch:
+            if not isinstance(row, dict):
+                self.error(line, row)
+        for line, review in zip(lines, reviews):
+            if not isinstance(review, Review):
+                self.error(line, ' '.join(
+                    message for messages in review.values()
+                    for message in messages
+                ))
+        valid = [review for review in reviews if isinstance(review, Review)]
+        if not valid:
+            return
+        result = import_reviews(valid, self.update)
+        for name in ('created', 'updated', 'skipped'):
+            self.totals[name] += len(getattr(result, name))
+
+    def error(self, line, message):
+        self.totals['errors'] += 1
+        self.stderr.write(f'Строка {line}: {message}')
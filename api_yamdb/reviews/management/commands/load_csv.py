@@ -0,0 +1,232 @@
+import csv
+import os
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.utils.dateparse import parse_datetime
+
+from reviews import taxonomy
+from reviews.models import (
+    Category, Comment, Genre, GenreTitle, Review, ReviewsUser, Title
+)
+from reviews.ratings import rebuild_ratings
+
+DEFAULT_PATH = settings.BASE_DIR / 'static' / 'data'
+
+
+class IdSet:
+    """Множество положительных id в виде битовой карты."""
+
+    def __init__(self, ids=()):
+        self.bits = bytearray()
+        for pk in ids:
+            self.add(pk)
+
+    def add(self, pk):
+        index, bit = divmod(pk, 8)
+        if index >= len(self.bits):
+            self.bits.extend(bytes(index - len(self.bits) + 1))
+        self.bits[index] |= 1 << bit
+
+    def __contains__(self, pk):
+        if pk is None:
+            return False
+        index, bit = divmod(pk, 8)
+        return index < len(self.bits) and bool(self.bits[index] & (1 << bit))
+
+
+def parse_id(value):
+    return int(value) if value else None
+
+
+@contextmanager
+def keep_auto_now_add(*models):
+    """Сохраняет даты из файла вместо подстановки текущего времени."""
+    fields = [
+        field for model in models for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now_add', False)
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает CSV-файлы в формате static/data пачками через '
+        'bulk_create в одной транзакции.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path', default=DEFAULT_PATH,
+            help='Каталог с CSV-файлами (по умолчанию static/data).'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Количество строк в одном INSERT.'
+        )
+        parser.add_argument(
+            '--ignore-conflicts', action='store_true',
+            help='Пропускать строки, которые уже есть в БД.'
+        )
+
+    def handle(self, *args, **options):
+        self.path = options['path']
+        self.batch_size = options['batch_size']
+        self.ignore_conflicts = options['ignore_conflicts']
+        if self.batch_size < 1:
+            raise CommandError('--batch-size должен быть больше нуля.')
+        self.unusable_password = make_password(None)
+        # Существующие строки тоже годятся как цели внешних ключей.
+        self.ids = {
+            model: IdSet(model.objects.values_list('id', flat=True))
+            for model in (ReviewsUser, Category, Genre, Title, Review)
+        }
+        tables = (
+            ('users.csv', ReviewsUser, self.build_user),
+            ('category.csv', Category, self.build_category),
+            ('genre.csv', Genre, self.build_genre),
+            ('titles.csv', Title, self.build_title),
+            ('genre_title.csv', GenreTitle, self.build_genre_title),
+            ('review.csv', Review, self.build_review),
+            ('comments.csv', Comment, self.build_comment),
+        )
+        with transaction.atomic(), keep_auto_now_add(Review, Comment):
+            for filename, model, build in tables:
+                self.load_table(filename, model, build)
+            started = time.monotonic()
+            rebuild_ratings()
+            self.stdout.write(
+                'Рейтинг произведений пересчитан за '
+                f'{time.monotonic() - started:.2f} с.'
+            )
+            self.reset_sequences([model for _, model, _ in tables])
+            transaction.on_commit(taxonomy.invalidate)
+        self.stdout.write(self.style.SUCCESS('Загрузка завершена.'))
+
+    def load_table(self, filename, model, build):
+        started = time.monotonic()
+        created = skipped = 0
+        batch = []
+        with open(os.path.join(self.path, filename),
+                  encoding='utf-8', newline='') as csv_file:
+            for row in csv.DictReader(csv_file):
+                obj = build(row)
+                if obj is None:
+                    skipped += 1
+                    continue
+                batch.append(obj)
+                if len(batch) >= self.batch_size:
+                    created += self.insert(model, batch)
+                    batch = []
+        if batch:
+            created += self.insert(model, batch)
+        elapsed = time.monotonic() - started
+        rate = created / elapsed if elapsed else created
+        self.stdout.write(
+            f'{filename}: {created} строк за {elapsed:.2f} с '
+            f'({rate:.0f} строк/с), пропущено {skipped}.'
+        )
+
+    def insert(self, model, batch):
+        model.objects.bulk_create(
+            batch, self.batch_size, ignore_conflicts=self.ignore_conflicts
+        )
+        return len(batch)
+
+    def reset_sequences(self, models):
+        # id брались из файлов: счётчики автоинкремента надо подвинуть.
+        statements = connection.ops.sequence_reset_sql(no_style(), models)
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+
+    def remember(self, model, obj):
+        self.ids[model].add(obj.id)
+        return obj
+
+    def build_user(self, row):
+        return self.remember(ReviewsUser, ReviewsUser(
+            id=int(row['id']),
+            username=row['username'],
+            email=row['email'],
+            role=row['role'] or ReviewsUser.Role.USER,
+            bio=row['bio'],
+            first_name=row['first_name'],
+            last_name=row['last_name'],
+            password=self.unusable_password,
+        ))
+
+    def build_category(self, row):
+        return self.remember(Category, Category(
+            id=int(row['id']), name=row['name'], slug=row['slug']
+        ))
+
+    def build_genre(self, row):
+        return self.remember(Genre, Genre(
+            id=int(row['id']), name=row['name'], slug=row['slug']
+        ))
+
+    def build_title(self, row):
+        category_id = parse_id(row['category'])
+        if category_id not in self.ids[Category]:
+            category_id = None
+        return self.remember(Title, Title(
+            id=int(row['id']),
+            name=row['name'],
+            year=int(row['year']),
+            category_id=category_id,
+            description=row.get('description', ''),
+        ))
+
+    def build_genre_title(self, row):
+        title_id = parse_id(row['title_id'])
+        genre_id = parse_id(row['genre_id'])
+        if title_id not in self.ids[Title] or genre_id not in self.ids[Genre]:
+            return None
+        return GenreTitle(
+            id=int(row['id']), title_id=title_id, genre_id=genre_id
+        )
+
+    def build_review(self, row):
+        title_id = parse_id(row['title_id'])
+        author_id = parse_id(row['author'])
+        if (
+            title_id not in self.ids[Title]
+            or author_id not in self.ids[ReviewsUser]
+        ):
+            return None
+        return self.remember(Review, Review(
+            id=int(row['id']),
+            title_id=title_id,
+            author_id=author_id,
+            text=row['text'],
+            score=int(row['score']),
+            pub_date=parse_datetime(row['pub_date']),
+        ))
+
+    def build_comment(self, row):
+        review_id = parse_id(row['review_id'])
+        author_id = parse_id(row['author'])
+        if (
+            review_id not in self.ids[Review]
+            or author_id not in self.ids[ReviewsUser]
+        ):
+            return None
+        return Comment(
+            id=int(row['id']),
+            review_id=review_id,
+            author_id=author_id,
+            text=row['text'],
+            pub_date=parse_datetime(row['pub_date']),
+        )
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from reviews import leaderboards
+from reviews.models import LeaderboardEntry
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересобирает рейтинги произведений и показывает среднюю оценку '
+        'каталога для настройки LEADERBOARDS["PRIOR_MEAN"].'
+    )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            leaderboards.rebuild()
+        mean = leaderboards.catalog_mean()
+        if mean is not None:
+            self.stdout.write(
+                f'Средняя оценка каталога: {mean:.2f}, PRIOR_MEAN: '
+                f'{leaderboards.get_config()["PRIOR_MEAN"]}.'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Рейтинги пересобраны: {LeaderboardEntry.objects.count()} '
+            'строк.'
+        ))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from reviews.ratings import rebuild_ratings
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает сохранённый рейтинг произведений по отзывам.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'title_ids', nargs='*', type=int,
+            help='id произведений; по умолчанию пересчитываются все.'
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            updated = rebuild_ratings(options['title_ids'] or None)
+        self.stdout.write(
+            self.style.SUCCESS(f'Рейтинг пересчитан: {updated} произведений.')
+        )
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from reviews.search import get_backend
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает полнотекстовый индекс произведений и отзывов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        using = options['database']
+        backend = get_backend(using)
+        with transaction.atomic(using=using):
+            backend.rebuild(using)
+        self.stdout.write(self.style.SUCCESS(
+            f'Поисковый индекс пересобран ({type(backend).__name__}).'
+        ))
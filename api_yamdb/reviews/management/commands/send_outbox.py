@@ -0,0 +1,48 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.outbox import get_config, send_pending
+
+
+class Command(BaseCommand):
+    help = (
+        'Отправляет письма из очереди EmailOutbox. С --loop работает '
+        'постоянно, опрашивая очередь раз в --interval секунд.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=get_config()['BATCH_SIZE'],
+            help='Сколько писем отправлять через одно соединение.'
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Не завершаться, когда очередь опустела.'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=5.0,
+            help='Пауза между опросами пустой очереди, секунд.'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size должен быть больше нуля.')
+        total_sent = total_failed = 0
+        while True:
+            sent, failed = send_pending(batch_size)
+            total_sent += sent
+            total_failed += failed
+            if sent or failed:
+                self.stdout.write(
+                    f'Отправлено писем: {sent}, ошибок: {failed}.'
+                )
+            if sent + failed == batch_size:
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Всего отправлено: {total_sent}, ошибок: {total_failed}.'
+        ))
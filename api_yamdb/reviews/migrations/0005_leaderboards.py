@@ -0,0 +1,94 @@
+# Generated by Django 3.2 on 2026-10-18 17:35
+
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+# Копия правил reviews.leaderboards на момент миграции: код приложения
+# может измениться, а миграция должна делать то же, что и раньше.
+def title_boards(category_id, year, genre_ids):
+    boards = ['all', f'year:{year}']
+    if category_id is not None:
+        boards += [f'category:{category_id}',
+                   f'category:{category_id}:year:{year}']
+    boards += [f'genre:{genre_id}' for genre_id in genre_ids]
+    return boards
+
+
+def fill_leaderboards(apps, schema_editor):
+    GenreTitle = apps.get_model('reviews', 'GenreTitle')
+    LeaderboardEntry = apps.get_model('reviews', 'LeaderboardEntry')
+    Title = apps.get_model('reviews', 'Title')
+    config = {
+        'MIN_REVIEWS': 5,
+        'PRIOR_MEAN': 5.5,
+        **getattr(settings, 'LEADERBOARDS', {}),
+    }
+    min_reviews = config['MIN_REVIEWS']
+    genres = defaultdict(list)
+    for title_id, genre_id in GenreTitle.objects.filter(
+        genre_id__isnull=False
+    ).values_list('title_id', 'genre_id'):
+        genres[title_id].append(genre_id)
+    batch = []
+    for pk, category_id, year, score_sum, reviews_count in (
+        Title.objects.values_list(
+            'pk', 'category_id', 'year', 'score_sum', 'reviews_count'
+        ).iterator()
+    ):
+        score = (
+            (score_sum + min_reviews * config['PRIOR_MEAN'])
+            / (reviews_count + min_reviews)
+            if reviews_count else None
+        )
+        batch.extend(
+            LeaderboardEntry(board=board, title_id=pk, score=score)
+            for board in title_boards(category_id, year, genres[pk])
+        )
+        if len(batch) >= 1000:
+            LeaderboardEntry.objects.bulk_create(batch)
+            batch = []
+    LeaderboardEntry.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_emailoutbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('board', models.CharField(max_length=64, verbose_name='Рейтинг')),
+                ('score', models.FloatField(blank=True, null=True, verbose_name='Взвешенная оценка')),
+            ],
+            options={
+                'verbose_name': 'Место в рейтинге',
+                'verbose_name_plural': 'Места в рейтингах',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['rating', 'id'], name='title_rating_idx'),
+        ),
+        migrations.AddField(
+            model_name='leaderboardentry',
+            name='title',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entries', to='reviews.title', verbose_name='Произведение'),
+        ),
+        migrations.AddIndex(
+            model_name='leaderboardentry',
+            index=models.Index(fields=['board', '-score', 'title'], name='leaderboard_board_score_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='leaderboardentry',
+            constraint=models.UniqueConstraint(fields=('title', 'board'), name='unique_leaderboard_title'),
+        ),
+        migrations.RunPython(fill_leaderboards, migrations.RunPython.noop),
+    ]
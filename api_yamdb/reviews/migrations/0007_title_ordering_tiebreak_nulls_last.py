@@ -0,0 +1,41 @@
+# Generated by Django 3.2 on 2026-10-18 18:13
+
+from django.db import migrations
+
+RATING_DESC_INDEX = 'title_rating_desc_idx'
+
+
+def create_rating_desc_index(apps, schema_editor):
+    # ?ordering=-rating идёт с NULLS LAST. В PostgreSQL обратный проход
+    # по title_rating_idx даёт NULLS FIRST, поэтому нужен свой индекс;
+    # SQLite такого порядка индекса не поддерживает, ему хватает
+    # title_rating_idx.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        f'CREATE INDEX IF NOT EXISTS {RATING_DESC_INDEX} ON reviews_title '
+        '(rating DESC NULLS LAST, id DESC)'
+    )
+
+
+def drop_rating_desc_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f'DROP INDEX IF EXISTS {RATING_DESC_INDEX}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_title_ordering_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='title',
+            options={'default_related_name': 'Title', 'ordering': ['name', 'id'], 'verbose_name': 'Произведение', 'verbose_name_plural': 'Произведения'},
+        ),
+        migrations.RunPython(
+            create_rating_desc_index, drop_rating_desc_index
+        ),
+    ]
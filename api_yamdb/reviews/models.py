@@ -1,10 +1,8 @@
 from django.db import models
-from django.db.models import Avg
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.core.exceptions import ValidationError
 from django.utils.timezone import now
-import json
 
 
 def validate_year(value):
@@ -35,7 +33,7 @@ class Category(models.Model):
         return self.name
 
     def to_json(self):
-        return json.loads(f'{{"name": "{self.name}", "slug": "{self.slug}"}}')
+        return {'name': self.name, 'slug': self.slug}
 
 
 class Genre(models.Model):
@@ -58,7 +56,7 @@ class Genre(models.Model):
         return self.name
 
     def to_json(self):
-        return json.loads(f'{{"name": "{self.name}", "slug": "{self.slug}"}}')
+        return {'name': self.name, 'slug': self.slug}
 
 
 class Title(models.Model):
@@ -85,21 +83,54 @@ class Title(models.Model):
     description = models.TextField(blank=True, verbose_name="Описание")
     genre = models.ManyToManyField(Genre, through='GenreTitle')
 
+    # Денормализованный рейтинг: поддерживается при изменении отзывов
+    # (см. reviews.ratings) и пересчитывается командой rebuild_ratings.
+    reviews_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Количество отзывов"
+    )
+    score_sum = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Сумма оценок"
+    )
+    rating = models.FloatField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name="Рейтинг"
+    )
+
     class Meta:
         verbose_name = "Произведение"
         verbose_name_plural = "Произведения"
         default_related_name = "Title"
-        ordering = ["name"]
+        # id - однозначный порядок страниц при одинаковых названиях.
+        ordering = ["name", "id"]
+        indexes = [
+            # Список сортируется по названию, в том числе внутри
+            # фильтра по году или категории.
+            models.Index(fields=["name", "id"], name="title_name_idx"),
+            models.Index(
+                fields=["year", "name", "id"], name="title_year_name_idx"
+            ),
+            models.Index(
+                fields=["category", "name", "id"],
+                name="title_category_name_idx"
+            ),
+            # Ключи ?ordering=; id - однозначный порядок при равенстве.
+            models.Index(fields=["rating", "id"], name="title_rating_idx"),
+            models.Index(
+                fields=["reviews_count", "id"],
+                name="title_reviews_count_idx"
+            ),
+            models.Index(fields=["year", "id"], name="title_year_idx"),
+        ]
 
     def __str__(self):
         return self.name
 
-    @property
-    def rating(self):
-        return (
-            self.reviews.aggregate(average_score=Avg('score'))['average_score']
-        )
-
 
 class GenreTitle(models.Model):
     title = models.ForeignKey(
@@ -222,6 +253,12 @@ class Review(models.Model):
                 name='unique_review_author'
             )
         ]
+        indexes = [
+            models.Index(
+                fields=['title', '-pub_date', '-id'],
+                name='review_title_pub_date_idx'
+            ),
+        ]
 
     def __str__(self):
         return f'Отзыв {self.score} от {self.author} на {self.title}'
@@ -250,6 +287,102 @@ class Comment(models.Model):
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
         ordering = ['pub_date']
+        indexes = [
+            models.Index(
+                fields=['review', 'pub_date', 'id'],
+                name='comment_review_pub_date_idx'
+            ),
+        ]
 
     def __str__(self):
         return f'Комментарий от {self.author} к отзыву {self.review}'
+
+
+class EmailOutbox(models.Model):
+    """Письмо, ожидающее отправки командой send_outbox."""
+    subject = models.CharField(max_length=255, verbose_name='Тема')
+    body = models.TextField(verbose_name='Текст')
+    from_email = models.CharField(
+        max_length=254,
+        blank=True,
+        verbose_name='Отправитель'
+    )
+    to = models.EmailField(max_length=254, verbose_name='Получатель')
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Дата создания'
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Попыток отправки'
+    )
+    # None - попытки исчерпаны, письмо больше не отправляется.
+    next_attempt_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        default=now,
+        verbose_name='Следующая попытка'
+    )
+    sent_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Дата отправки'
+    )
+    last_error = models.TextField(blank=True, verbose_name='Последняя ошибка')
+
+    class Meta:
+        verbose_name = 'Письмо в очереди'
+        verbose_name_plural = 'Очередь писем'
+        ordering = ['id']
+        indexes = [
+            models.Index(
+                fields=['next_attempt_at', 'id'],
+                condition=models.Q(sent_at__isnull=True),
+                name='emailoutbox_pending_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'Письмо «{self.subject}» для {self.to}'
+
+
+class LeaderboardEntry(models.Model):
+    """
+    Строка материализованного рейтинга произведений (reviews.leaderboards).
+
+    board - ключ списка: all, category:<id>, genre:<id>, year:<год>
+    или category:<id>:year:<год>. score - взвешенная оценка, NULL у
+    произведения без отзывов.
+    """
+    board = models.CharField(max_length=64, verbose_name='Рейтинг')
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='leaderboard_entries',
+        verbose_name='Произведение'
+    )
+    score = models.FloatField(
+        null=True,
+        blank=True,
+        verbose_name='Взвешенная оценка'
+    )
+
+    class Meta:
+        verbose_name = 'Место в рейтинге'
+        verbose_name_plural = 'Места в рейтингах'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['title', 'board'],
+                name='unique_leaderboard_title'
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=['board', '-score', 'title'],
+                name='leaderboard_board_score_idx'
+            ),
+        ]
+
+    def __str__(self):
+        score = 'нет оценки' if self.score is None else f'{self.score:.2f}'
+        return f'{self.board}: {self.title_id} ({score})'
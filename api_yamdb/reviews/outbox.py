@@ -0,0 +1,99 @@
+"""
+Очередь исходящих писем.
+
+enqueue() записывает письмо в таблицу EmailOutbox в текущей транзакции,
+поэтому запрос не ждёт почтовый сервер, а письмо не теряется при откате.
+Очередь разбирает команда send_outbox: пачками, через одно соединение
+с почтовым бэкендом, с повторными попытками и экспоненциальной паузой.
+В режиме EAGER (тесты, разработка) письмо отправляется сразу после
+коммита в том же процессе.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils.timezone import now
+
+from .models import EmailOutbox
+
+DEFAULTS = {
+    'EAGER': False,
+    'BATCH_SIZE': 100,
+    'MAX_ATTEMPTS': 5,
+    'BACKOFF_SECONDS': 60,
+}
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'EMAIL_OUTBOX', {})}
+
+
+def enqueue(subject, body, to, from_email=None):
+    email = EmailOutbox.objects.create(
+        subject=subject,
+        body=body,
+        to=to,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+    )
+    if get_config()['EAGER']:
+        transaction.on_commit(lambda: send_pending(ids=[email.pk]))
+    return email
+
+
+def backoff(attempts, config):
+    """Пауза перед следующей попыткой: BACKOFF_SECONDS * 2^(n-1)."""
+    return timedelta(seconds=config['BACKOFF_SECONDS'] * 2 ** (attempts - 1))
+
+
+def send_pending(batch_size=None, ids=None):
+    """
+    Отправляет одну пачку писем, чей срок попытки наступил.
+
+    Возвращает пару (отправлено, ошибок). Строки блокируются на время
+    отправки (SKIP LOCKED), так что несколько обработчиков не отправят
+    одно письмо дважды.
+    """
+    config = get_config()
+    batch_size = batch_size or config['BATCH_SIZE']
+    sent = failed = 0
+    with transaction.atomic():
+        emails = EmailOutbox.objects.select_for_update(
+            skip_locked=True
+        ).filter(sent_at__isnull=True, next_attempt_at__lte=now())
+        if ids is not None:
+            emails = emails.filter(pk__in=ids)
+        emails = list(emails.order_by('next_attempt_at', 'id')[:batch_size])
+        if not emails:
+            return sent, failed
+        connection = get_connection(fail_silently=False)
+        try:
+            for email in emails:
+                try:
+                    # После обрыва соединение открывается заново,
+                    # иначе open() ничего не делает.
+                    connection.open()
+                    connection.send_messages([EmailMessage(
+                        email.subject, email.body, email.from_email,
+                        [email.to], connection=connection,
+                    )])
+                except Exception as error:
+                    connection.close()
+                    email.attempts += 1
+                    email.last_error = f'{type(error).__name__}: {error}'
+                    email.next_attempt_at = (
+                        now() + backoff(email.attempts, config)
+                        if email.attempts < config['MAX_ATTEMPTS'] else None
+                    )
+                    failed += 1
+                else:
+                    email.attempts += 1
+                    email.sent_at = now()
+                    email.last_error = ''
+                    sent += 1
+        finally:
+            connection.close()
+        EmailOutbox.objects.bulk_update(
+            emails, ('attempts', 'next_attempt_at', 'sent_at', 'last_error')
+        )
+    return sent, failed
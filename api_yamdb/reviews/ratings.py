@@ -0,0 +1,74 @@
+from django.db.models import (
+    Avg, Case, Count, F, FloatField, OuterRef, Subquery, Sum, Value, When
+)
+from django.db.models.functions import Cast, Coalesce
+
+from . import leaderboards
+from .models import Review, Title
+from .versions import (
+    CATALOG_TAG, TITLES_TAG, bump_version_on_commit, title_tag
+)
+
+
+def apply_review_delta(title_id, score_delta=0, count_delta=0):
+    """
+    Сдвигает сохранённые счётчики произведения одним UPDATE.
+
+    Все выражения в SET видят значения до обновления, поэтому рейтинг
+    считается по уже сдвинутым сумме и количеству. Оценку в списках
+    reviews.leaderboards обновляет триггер (или update_scores).
+    """
+    new_count = F('reviews_count') + count_delta
+    new_sum = F('score_sum') + score_delta
+    updated = Title.objects.filter(pk=title_id).update(
+        reviews_count=new_count,
+        score_sum=new_sum,
+        rating=Case(
+            When(reviews_count=-count_delta, then=Value(None)),
+            default=Cast(new_sum, FloatField()) / new_count,
+            output_field=FloatField(),
+        ),
+    )
+    leaderboards.update_scores([title_id])
+    return updated
+
+
+def rebuild_ratings(title_ids=None):
+    """
+    Пересчитывает счётчики и рейтинг по таблице отзывов с нуля.
+
+    Полный пересчёт (после load_csv) пересобирает и reviews.leaderboards:
+    загруженные пачкой произведения ещё не внесены в списки.
+    """
+    reviews = (
+        Review.objects
+        .filter(title=OuterRef('pk'))
+        .order_by()
+        .values('title')
+    )
+    titles = Title.objects.all()
+    if title_ids is not None:
+        title_ids = list(title_ids)
+        titles = titles.filter(pk__in=title_ids)
+        bump_version_on_commit(
+            TITLES_TAG, *(title_tag(title_id) for title_id in title_ids)
+        )
+    else:
+        bump_version_on_commit(CATALOG_TAG)
+    updated = titles.update(
+        reviews_count=Coalesce(
+            Subquery(reviews.annotate(value=Count('id')).values('value')), 0
+        ),
+        score_sum=Coalesce(
+            Subquery(reviews.annotate(value=Sum('score')).values('value')), 0
+        ),
+        rating=Subquery(
+            reviews.annotate(value=Avg('score')).values('value'),
+            output_field=FloatField()
+        ),
+    )
+    if title_ids is None:
+        leaderboards.rebuild()
+    else:
+        leaderboards.update_scores(title_ids)
+    return updated
@@ -0,0 +1,225 @@
+"""
+Полнотекстовый поиск по произведениям (name, description) и отзывам.
+
+Бэкенд выбирается по типу БД или настройкой SEARCH_BACKEND
+('sqlite', 'postgres', 'simple'):
+
+- sqlite: виртуальные таблицы FTS5 с внешним содержимым, которые
+  синхронизируются триггерами, ранжирование bm25();
+- postgres: GIN-индексы по выражению to_tsvector(), синхронизация
+  не нужна, ранжирование ts_rank();
+- simple: icontains без индекса, для остальных СУБД.
+
+Индексы создаются после migrate (см. reviews.signals) и пересобираются
+командой rebuild_search_index.
+"""
+import re
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import FloatField, Q, Value
+
+from .models import Review, Title
+
+TOKEN_RE = re.compile(r'\w+')
+
+
+def tokenize(query):
+    return TOKEN_RE.findall(query or '')
+
+
+class SimpleSearchBackend:
+    def install(self, using='default'):
+        pass
+
+    def rebuild(self, using='default'):
+        pass
+
+    def search_titles(self, queryset, query):
+        condition = Q()
+        for token in tokenize(query):
+            condition &= (
+                Q(name__icontains=token) | Q(description__icontains=token)
+            )
+        return queryset.filter(condition).annotate(
+            search_rank=Value(0.0, output_field=FloatField())
+        )
+
+    def search_reviews(self, queryset, query):
+        condition = Q()
+        for token in tokenize(query):
+            condition &= Q(text__icontains=token)
+        return queryset.filter(condition).annotate(
+            search_rank=Value(0.0, output_field=FloatField())
+        )
+
+
+class SqliteSearchBackend:
+    # Таблица FTS5 -> (таблица с данными, индексируемые столбцы).
+    INDEXES = {
+        'reviews_title_fts': (Title._meta.db_table, ('name', 'description')),
+        'reviews_review_fts': (Review._meta.db_table, ('text',)),
+    }
+
+    def install(self, using='default'):
+        with connections[using].cursor() as cursor:
+            for fts, (table, columns) in self.INDEXES.items():
+                cursor.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' "
+                    'AND name = %s', [fts]
+                )
+                if cursor.fetchone():
+                    continue
+                for sql in self.install_sql(fts, table, columns):
+                    cursor.execute(sql)
+                cursor.execute(
+                    f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"
+                )
+
+    @staticmethod
+    def install_sql(fts, table, columns):
+        names = ', '.join(columns)
+        new = ', '.join(f'new.{column}' for column in columns)
+        old = ', '.join(f'old.{column}' for column in columns)
+        delete = (
+            f"INSERT INTO {fts}({fts}, rowid, {names}) "
+            f"VALUES ('delete', old.id, {old});"
+        )
+        insert = f'INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new});'
+        return (
+            f'CREATE VIRTUAL TABLE {fts} USING fts5({names}, '
+            f"content='{table}', content_rowid='id', "
+            "tokenize='unicode61')",
+            f'CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} '
+            f'BEGIN {insert} END',
+            f'CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} '
+            f'BEGIN {delete} END',
+            # Только при изменении индексируемых столбцов: пересчёт
+            # рейтинга не переиндексирует произведения.
+            f'CREATE TRIGGER {fts}_au AFTER UPDATE OF {names} ON {table} '
+            f'BEGIN {delete} {insert} END',
+        )
+
+    def rebuild(self, using='default'):
+        with connections[using].cursor() as cursor:
+            for fts, (table, columns) in self.INDEXES.items():
+                cursor.execute(f'DROP TABLE IF EXISTS {fts}')
+                for suffix in ('ai', 'ad', 'au'):
+                    cursor.execute(f'DROP TRIGGER IF EXISTS {fts}_{suffix}')
+        self.install(using)
+
+    @staticmethod
+    def to_match(query):
+        tokens = tokenize(query)
+        if not tokens:
+            return None
+        # Каждое слово в кавычках: пользовательский ввод не ломает
+        # синтаксис MATCH. Последнее слово ищется по префиксу.
+        terms = ['"{}"'.format(token.replace('"', '""')) for token in tokens]
+        terms[-1] += '*'
+        return ' '.join(terms)
+
+    def search(self, queryset, query, fts):
+        match = self.to_match(query)
+        if match is None:
+            return queryset.none()
+        table = queryset.model._meta.db_table
+        # Таблица FTS5 присоединяется к запросу: bm25() считается один
+        # раз на найденную строку, а не коррелированным подзапросом.
+        # bm25() отрицателен: чем меньше, тем релевантнее.
+        return queryset.extra(
+            select={'search_rank': f'-bm25({fts})'},
+            tables=[fts],
+            where=[f'{fts}.rowid = {table}.id', f'{fts} MATCH %s'],
+            params=[match],
+        )
+
+    def search_titles(self, queryset, query):
+        return self.search(queryset, query, 'reviews_title_fts')
+
+    def search_reviews(self, queryset, query):
+        return self.search(queryset, query, 'reviews_review_fts')
+
+
+class PostgresSearchBackend:
+    CONFIG = 'russian'
+    # Индекс по тому же выражению, что строит SearchVector, поэтому
+    # фильтр @@ использует его.
+    INDEXES = {
+        'reviews_title_search_idx': (
+            Title._meta.db_table, ('name', 'description')
+        ),
+        'reviews_review_search_idx': (Review._meta.db_table, ('text',)),
+    }
+
+    def install(self, using='default'):
+        with connections[using].cursor() as cursor:
+            for name, (table, columns) in self.INDEXES.items():
+                document = " || ' ' || ".join(
+                    f"COALESCE({column}, '')" for column in columns
+                )
+                cursor.execute(
+                    f'CREATE INDEX IF NOT EXISTS {name} ON {table} '
+                    f"USING GIN (to_tsvector('{self.CONFIG}'::regconfig, "
+                    f'{document}))'
+                )
+
+    def rebuild(self, using='default'):
+        with connections[using].cursor() as cursor:
+            for name in self.INDEXES:
+                cursor.execute(f'REINDEX INDEX {name}')
+
+    def search(self, queryset, query, *fields):
+        from django.contrib.postgres.search import (
+            SearchQuery, SearchRank, SearchVector
+        )
+
+        if not tokenize(query):
+            return queryset.none()
+        vector = SearchVector(*fields, config=self.CONFIG)
+        search_query = SearchQuery(query, config=self.CONFIG)
+        return queryset.annotate(
+            search_document=vector,
+            search_rank=SearchRank(vector, search_query),
+        ).filter(search_document=search_query)
+
+    def search_titles(self, queryset, query):
+        return self.search(queryset, query, 'name', 'description')
+
+    def search_reviews(self, queryset, query):
+        return self.search(queryset, query, 'text')
+
+
+BACKENDS = {
+    'simple': SimpleSearchBackend,
+    'sqlite': SqliteSearchBackend,
+    'postgres': PostgresSearchBackend,
+}
+VENDORS = {'sqlite': 'sqlite', 'postgresql': 'postgres'}
+
+
+def get_backend(using='default'):
+    name = getattr(settings, 'SEARCH_BACKEND', None) or VENDORS.get(
+        connections[using].vendor, 'simple'
+    )
+    return BACKENDS[name]()
+
+
+def search_titles(queryset, query):
+    """Произведения по запросу, от более релевантных к менее."""
+    # В запросе без слов (`?q="`) искать нечего, а у пустой выдачи
+    # бэкенда нет поля search_rank для сортировки.
+    if not tokenize(query):
+        return queryset.none()
+    return get_backend(queryset.db).search_titles(queryset, query).order_by(
+        '-search_rank', 'id'
+    )
+
+
+def search_reviews(queryset, query):
+    """Отзывы по запросу, от более релевантных к менее."""
+    if not tokenize(query):
+        return queryset.none()
+    return get_backend(queryset.db).search_reviews(queryset, query).order_by(
+        '-search_rank', '-id'
+    )
@@ -0,0 +1,127 @@
+from django.db import transaction
+from django.db.models.signals import (
+    m2m_changed, post_delete, post_migrate, post_save, pre_delete
+)
+from django.dispatch import receiver
+
+from . import leaderboards, search, taxonomy
+from .models import (
+    Category, Comment, Genre, GenreTitle, Review, ReviewsUser, Title
+)
+from .ratings import rebuild_ratings
+from .versions import (
+    AUTHORS_TAG, CATALOG_TAG, TITLES_TAG, bump_version_on_commit,
+    review_comments_tag, title_reviews_tag, title_tag, user_tag
+)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+def invalidate_taxonomy(sender, **kwargs):
+    # Сброс после коммита: иначе другой процесс успеет перечитать
+    # справочник до фиксации изменений и закеширует старые данные.
+    transaction.on_commit(taxonomy.invalidate)
+
+
+@receiver(post_save, sender=ReviewsUser)
+@receiver(post_delete, sender=ReviewsUser)
+def invalidate_user(sender, instance, created=False, **kwargs):
+    # Снимок пользователя в api.authentication перечитывается из БД.
+    # У нового пользователя ещё нет отзывов и комментариев.
+    tags = [user_tag(instance.pk)]
+    if not created:
+        tags.append(AUTHORS_TAG)
+    bump_version_on_commit(*tags)
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+@receiver(post_save, sender=GenreTitle)
+@receiver(post_delete, sender=GenreTitle)
+def invalidate_title(sender, instance, **kwargs):
+    title_id = instance.pk if sender is Title else instance.title_id
+    bump_version_on_commit(TITLES_TAG, title_tag(title_id))
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_save, sender=GenreTitle)
+@receiver(post_delete, sender=GenreTitle)
+def refresh_title_leaderboards(sender, instance, **kwargs):
+    title_id = instance.pk if sender is Title else instance.title_id
+    leaderboards.refresh_titles_on_commit([title_id])
+
+
+@receiver(post_delete, sender=Category)
+def drop_category_leaderboards(sender, instance, **kwargs):
+    # SET_NULL у Title обновляет произведения без сигналов.
+    leaderboards.drop_board(leaderboards.board_key(category_id=instance.pk))
+
+
+@receiver(post_delete, sender=Genre)
+def drop_genre_leaderboards(sender, instance, **kwargs):
+    # Связи GenreTitle остаются с genre_id = NULL.
+    leaderboards.drop_board(leaderboards.board_key(genre_id=instance.pk))
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def invalidate_title_genres(sender, instance, action, reverse, pk_set,
+                            **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        bump_version_on_commit(TITLES_TAG, title_tag(instance.pk))
+        leaderboards.refresh_titles_on_commit([instance.pk])
+    elif pk_set:
+        bump_version_on_commit(
+            TITLES_TAG, *(title_tag(title_id) for title_id in pk_set)
+        )
+        leaderboards.refresh_titles_on_commit(pk_set)
+    else:
+        # genre.title_set.clear(): затронутые произведения неизвестны.
+        bump_version_on_commit(CATALOG_TAG)
+        leaderboards.drop_board(leaderboards.board_key(genre_id=instance.pk))
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def invalidate_reviews(sender, instance, **kwargs):
+    # Отзыв меняет рейтинг, который есть в списке и карточке
+    # произведения.
+    bump_version_on_commit(
+        TITLES_TAG,
+        title_tag(instance.title_id),
+        title_reviews_tag(instance.title_id),
+    )
+
+
+@receiver(pre_delete, sender=ReviewsUser)
+def collect_author_titles(sender, instance, **kwargs):
+    # Отзывы автора удаляются каскадом, минуя ReviewViewSet и админку.
+    # Счётчики пересчитываются один раз на произведение в post_delete,
+    # когда отзывов уже нет.
+    instance._review_title_ids = set(
+        Review.objects.filter(author=instance).order_by()
+        .values_list('title_id', flat=True)
+    )
+
+
+@receiver(post_delete, sender=ReviewsUser)
+def rebuild_author_titles(sender, instance, **kwargs):
+    title_ids = getattr(instance, '_review_title_ids', None)
+    if title_ids:
+        rebuild_ratings(title_ids)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comments(sender, instance, **kwargs):
+    bump_version_on_commit(review_comments_tag(instance.review_id))
+
+
+@receiver(post_migrate)
+def install_search_index(sender, using='default', **kwargs):
+    if sender.name == 'reviews':
+        search.get_backend(using).install(using)
+        leaderboards.install(using)
@@ -0,0 +1,90 @@
+"""
+Кеш категорий и жанров в памяти процесса.
+
+Справочники меняются редко, поэтому целиком держатся в словарях
+slug -> объект. Изменения сбрасывают кеш во всех процессах через
+счётчик версии (см. reviews.signals).
+"""
+import threading
+
+from .models import Category, Genre
+from .versions import bump_version, get_version
+
+TAG = 'taxonomy'
+MODELS = (Category, Genre)
+
+_lock = threading.Lock()
+_state = {'version': None, 'slugs': {}}
+
+
+def _load(version):
+    slugs = {
+        model: {obj.slug: obj for obj in model.objects.all()}
+        for model in MODELS
+    }
+    _state.update(version=version, slugs=slugs)
+
+
+def _slugs(model):
+    version = get_version(TAG)
+    if _state['version'] != version:
+        with _lock:
+            if _state['version'] != version:
+                _load(version)
+    return _state['slugs'][model]
+
+
+def _reload(model, stale):
+    """
+    Перечитывает справочники, если снимок stale ещё текущий.
+
+    Снимок не дополняется на месте: get_all отдаёт его в порядке
+    Meta.ordering, а другие потоки читают его без блокировки.
+    """
+    with _lock:
+        if _state['slugs'].get(model) is stale:
+            _load(_state['version'])
+
+
+def get_all(model):
+    """Все объекты справочника в порядке Meta.ordering модели."""
+    return list(_slugs(model).values())
+
+
+def get_by_slug(model, slug):
+    """
+    Объект справочника по slug или None.
+
+    Промах проверяется по БД: объект мог быть создан в другом процессе,
+    который ещё не увеличил версию.
+    """
+    slugs = _slugs(model)
+    obj = slugs.get(slug)
+    if obj is None:
+        obj = model.objects.filter(slug=slug).first()
+        if obj is not None:
+            _reload(model, slugs)
+    return obj
+
+
+def get_many_by_slug(model, slugs):
+    """
+    Словарь slug -> объект для найденных slug.
+
+    Все промахи проверяются по БД одним запросом, как в get_by_slug.
+    """
+    cached = _slugs(model)
+    found = {slug: cached[slug] for slug in slugs if slug in cached}
+    missing = set(slugs) - found.keys()
+    if missing:
+        loaded = {
+            obj.slug: obj for obj in model.objects.filter(slug__in=missing)
+        }
+        if loaded:
+            found.update(loaded)
+            _reload(model, cached)
+    return found
+
+
+def invalidate():
+    bump_version(TAG)
@@ -0,0 +1,102 @@
+"""
+Счётчики версий в кеше Django, общие для всех процессов.
+
+Локальные кеши сравнивают запомненную версию с текущей и сбрасываются,
+когда какой-либо процесс увеличил счётчик. Счётчики хранятся в кеше
+VERSION_CACHE_ALIAS отдельно от остальных данных, чтобы их не вытесняли
+записи кеша ответов, и общие, только если общий его бэкенд (см.
+is_shared_cache).
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+
+KEY_TEMPLATE = 'reviews:version:{}'
+
+# Весь каталог: увеличивается после массовых операций (load_csv,
+# rebuild_ratings), когда поштучные теги неизвестны.
+CATALOG_TAG = 'catalog'
+TITLES_TAG = 'titles'
+# Имена авторов в отзывах и комментариях.
+AUTHORS_TAG = 'authors'
+# Бэкенды, которые не видны другим процессам.
+LOCAL_CACHE_BACKENDS = (LocMemCache, DummyCache)
+
+
+def get_cache_alias():
+    return getattr(settings, 'VERSION_CACHE_ALIAS', DEFAULT_CACHE_ALIAS)
+
+
+def is_shared_cache(alias=None):
+    """Виден ли кеш alias (по умолчанию - кеш версий) всем процессам."""
+    alias = alias or get_cache_alias()
+    return not isinstance(caches[alias], LOCAL_CACHE_BACKENDS)
+
+
+def _key(tag):
+    return KEY_TEMPLATE.format(tag)
+
+
+def _initial():
+    # Уникальное начальное значение, чтобы вытесненный из кеша счётчик
+    # не совпал с версией, запомненной каким-нибудь процессом.
+    return time.time_ns()
+
+
+def get_version(tag):
+    key = _key(tag)
+    cache = caches[get_cache_alias()]
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _initial(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def get_versions(*tags):
+    """Версии нескольких тегов за одно обращение к кешу."""
+    cache = caches[get_cache_alias()]
+    keys = [_key(tag) for tag in tags]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, _initial(), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump_version(*tags):
+    cache = caches[get_cache_alias()]
+    for tag in tags:
+        key = _key(tag)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _initial(), timeout=None)
+
+
+def bump_version_on_commit(*tags):
+    # После коммита: иначе другой процесс успеет прочитать старые данные
+    # и сохранить их под новой версией.
+    transaction.on_commit(lambda: bump_version(*tags))
+
+
+def title_tag(title_id):
+    return f'title:{title_id}'
+
+
+def title_reviews_tag(title_id):
+    return f'title:{title_id}:reviews'
+
+
+def review_comments_tag(review_id):
+    return f'review:{review_id}:comments'
+
+
+def user_tag(user_id):
+    """Версия снимка пользователя для аутентификации."""
+    return f'user:{user_id}'
@@ -1,6 +1,7 @@
 import os
 import sys
 
+import pytest
 from django.utils.version import get_version
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -33,3 +34,36 @@ assert get_version() < '4.0.0', 'Пожалуйста, используйте в
 pytest_plugins = [
     'tests.fixtures.fixture_user',
 ]
+
+
+def temp_caches(caches, path):
+    """CACHES с файловыми кешами в папке path вместо api_yamdb/cache."""
+    return {
+        alias: {**config, 'LOCATION': str(path / alias)}
+        if 'LOCATION' in config else config
+        for alias, config in caches.items()
+    }
+
+
+@pytest.fixture(scope='session')
+def django_db_modify_db_settings(django_db_modify_db_settings_parallel_suffix,
+                                 tmp_path_factory):
+    # Создание тестовой БД (createcachetable) открывает все кеши.
+    from django.conf import settings
+
+    settings.CACHES = temp_caches(
+        settings.CACHES, tmp_path_factory.mktemp('cache')
+    )
+
+
+@pytest.fixture(autouse=True)
+def clear_cache(settings, tmp_path):
+    # У каждого теста свои пустые кеши.
+    settings.CACHES = temp_caches(settings.CACHES, tmp_path / 'cache')
+
+
+@pytest.fixture(autouse=True)
+def send_email_on_commit(settings):
+    # Письма отправляются сразу после коммита, как ожидают тесты
+    # регистрации; очередь проверяется в test_17_email_outbox.
+    settings.EMAIL_OUTBOX = {'EAGER': True}
@@ -0,0 +1,128 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleRating:
+
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+
+    def get_rating(self, client, title_id):
+        response = client.get(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title_id)
+        )
+        assert response.status_code == HTTPStatus.OK
+        return response.json()['rating']
+
+    def test_01_rating_follows_review_changes(self, admin_client,
+                                              user_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(admin_client, title_id, 'Отлично', 10)
+        response = create_single_review(user_client, title_id, 'Так себе', 4)
+        assert self.get_rating(admin_client, title_id) == 7, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'создании отзыва.'
+        )
+
+        review_url = self.REVIEW_DETAIL_URL_TEMPLATE.format(
+            title_id=title_id, review_id=response.json()['id']
+        )
+        user_client.patch(review_url, data={'score': 6})
+        assert self.get_rating(admin_client, title_id) == 8, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'изменении оценки отзыва.'
+        )
+
+        user_client.delete(review_url)
+        assert self.get_rating(admin_client, title_id) == 10, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'удалении отзыва.'
+        )
+        assert self.get_rating(admin_client, titles[1]['id']) is None, (
+            'Рейтинг произведения без отзывов должен быть равен `None`.'
+        )
+
+    def test_02_rebuild_ratings_command(self, admin_client):
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(admin_client, title_id, 'Неплохо', 7)
+        Title.objects.update(reviews_count=0, score_sum=0, rating=None)
+
+        call_command('rebuild_ratings')
+
+        title = Title.objects.get(pk=title_id)
+        assert (title.reviews_count, title.score_sum, title.rating) == (
+            1, 7, 7
+        ), (
+            'Проверьте, что команда `rebuild_ratings` восстанавливает '
+            'сохранённый рейтинг произведений по отзывам.'
+        )
+
+    def test_03_rating_follows_author_deletion(self, admin_client,
+                                               user_client, user):
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(user_client, title_id, 'Отлично', 10)
+        create_single_review(admin_client, title_id, 'Плохо', 2)
+
+        response = admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+
+        title = Title.objects.get(pk=title_id)
+        assert (title.reviews_count, title.score_sum, title.rating) == (
+            1, 2, 2
+        ), (
+            'Проверьте, что рейтинг произведения пересчитывается, когда '
+            'отзывы удаляются вместе с автором.'
+        )
+
+    def test_04_cascade_updates_titles_once(self, admin_client,
+                                            django_user_model):
+        from reviews.models import Review, Title
+
+        titles, _, _ = create_titles(admin_client)
+        authors = [
+            django_user_model.objects.create(
+                username=f'author{number}', email=f'author{number}@yamdb.fake'
+            )
+            for number in range(5)
+        ]
+        for title in titles[:2]:
+            Review.objects.bulk_create(
+                Review(title_id=title['id'], author=author, score=5,
+                       text='Ок')
+                for author in authors
+            )
+
+        def title_updates(context):
+            return [
+                query['sql'] for query in context.captured_queries
+                if query['sql'].startswith('UPDATE "reviews_title"')
+            ]
+
+        with CaptureQueriesContext(connection) as context:
+            authors[0].delete()
+        assert len(title_updates(context)) == 1, (
+            'Проверьте, что при удалении автора счётчики его произведений '
+            'пересчитываются одним запросом, а не по запросу на отзыв.'
+        )
+        with CaptureQueriesContext(connection) as context:
+            Title.objects.get(pk=titles[0]['id']).delete()
+        assert not title_updates(context), (
+            'Проверьте, что удаление произведения не обновляет счётчики '
+            'самого удаляемого произведения.'
+        )
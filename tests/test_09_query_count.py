@@ -0,0 +1,171 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+TRANSACTION_STATEMENTS = ('BEGIN', 'COMMIT', 'SAVEPOINT', 'RELEASE')
+
+
+def data_queries(context):
+    return [
+        query['sql'] for query in context.captured_queries
+        if not query['sql'].startswith(TRANSACTION_STATEMENTS)
+    ]
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == HTTPStatus.OK, (
+        f'Проверьте, что GET-запрос к `{url}` возвращает ответ со статусом '
+        '200.'
+    )
+    return len(context.captured_queries)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09QueryCount:
+
+    TITLES_URL = '/api/v1/titles/'
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+
+    @pytest.fixture
+    def titles(self):
+        from reviews.models import Category, Genre, Title
+
+        category = Category.objects.create(name='Фильм', slug='movie')
+        genres = [
+            Genre.objects.create(name='Драма', slug='drama'),
+            Genre.objects.create(name='Комедия', slug='comedy'),
+        ]
+        result = []
+        for number in range(6):
+            title = Title.objects.create(
+                name=f'Произведение {number}', year=2000, category=category
+            )
+            title.genre.set(genres)
+            result.append(title)
+        return result
+
+    def test_01_titles_list_constant_queries(self, client, titles):
+        small_page = count_queries(client, f'{self.TITLES_URL}?limit=1')
+        full_page = count_queries(
+            client, f'{self.TITLES_URL}?limit={len(titles)}'
+        )
+        assert small_page == full_page, (
+            f'Проверьте, что число запросов к БД при GET-запросе к '
+            f'`{self.TITLES_URL}` не зависит от размера страницы: '
+            f'{small_page} запросов для одного произведения и {full_page} '
+            f'для {len(titles)}.'
+        )
+
+    def test_02_title_detail_queries(self, client, titles):
+        url = self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=titles[0].id)
+        queries = count_queries(client, url)
+        assert queries <= 2, (
+            f'Проверьте, что GET-запрос к `{self.TITLE_DETAIL_URL_TEMPLATE}` '
+            'загружает произведение с категорией и жанрами не более чем за '
+            f'два запроса к БД. Сейчас запросов: {queries}.'
+        )
+
+    def test_03_review_create_queries(self, user_client, titles):
+        url = f'/api/v1/titles/{titles[0].id}/reviews/'
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(url, data={'text': 'Ого', 'score': 8})
+        assert response.status_code == HTTPStatus.CREATED
+        queries = data_queries(context)
+        title_lookups = [
+            sql for sql in queries
+            if sql.startswith('SELECT') and 'FROM "reviews_title"' in sql
+        ]
+        assert len(title_lookups) == 1 and len(queries) <= 4, (
+            f'Проверьте, что POST-запрос к `{url}` загружает произведение '
+            'один раз и обходится без отдельной проверки на повторный '
+            f'отзыв. Сейчас запросов к БД: {len(queries)}.'
+        )
+
+        response = user_client.post(url, data={'text': 'Ещё', 'score': 2})
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            f'Если пользователь повторно отправляет отзыв на `{url}` - '
+            'должен вернуться ответ со статусом 400.'
+        )
+
+    def test_04_comments_require_matching_title(self, client, user,
+                                                titles):
+        from reviews.models import Review
+
+        review = Review.objects.create(
+            title=titles[0], author=user, text='Хорошо', score=7
+        )
+        url = '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+        response = client.get(
+            url.format(title_id=titles[1].id, review_id=review.id)
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            f'Проверьте, что GET-запрос к `{url}` с отзывом, относящимся к '
+            'другому произведению, возвращает ответ со статусом 404.'
+        )
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(
+                url.format(title_id=titles[0].id, review_id=review.id)
+            )
+        assert response.status_code == HTTPStatus.OK
+        review_lookups = [
+            sql for sql in data_queries(context)
+            if sql.startswith('SELECT "reviews_review"')
+        ]
+        assert review_lookups and all(
+            '"reviews_review"."text"' not in sql for sql in review_lookups
+        ), (
+            f'Проверьте, что GET-запрос к `{url}` не загружает текст отзыва '
+            'для проверки его существования.'
+        )
+
+    def test_05_reviews_and_comments_constant_queries(self, client,
+                                                      django_user_model,
+                                                      titles):
+        from reviews.models import Comment, Review
+
+        authors = [
+            django_user_model.objects.create_user(
+                username=f'author{number}',
+                email=f'author{number}@yamdb.fake'
+            )
+            for number in range(5)
+        ]
+        reviews = [
+            Review.objects.create(
+                title=title, author=author, text='Текст', score=5
+            )
+            for title, count in ((titles[0], 1), (titles[1], 5))
+            for author in authors[:count]
+        ]
+        for review, count in ((reviews[0], 1), (reviews[1], 5)):
+            for author in authors[:count]:
+                Comment.objects.create(
+                    review=review, author=author, text='Комментарий'
+                )
+
+        url = '/api/v1/titles/{title_id}/reviews/'
+        single = count_queries(client, url.format(title_id=titles[0].id))
+        several = count_queries(client, url.format(title_id=titles[1].id))
+        assert single == several, (
+            f'Проверьте, что число запросов к БД при GET-запросе к `{url}` '
+            'не зависит от количества отзывов на странице: '
+            f'{single} для одного отзыва и {several} для пяти.'
+        )
+
+        url = '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+        single = count_queries(client, url.format(
+            title_id=titles[0].id, review_id=reviews[0].id
+        ))
+        several = count_queries(client, url.format(
+            title_id=titles[1].id, review_id=reviews[1].id
+        ))
+        assert single == several, (
+            f'Проверьте, что число запросов к БД при GET-запросе к `{url}` '
+            'не зависит от количества комментариев на странице: '
+            f'{single} для одного комментария и {several} для пяти.'
+        )
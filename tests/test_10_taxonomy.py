@@ -0,0 +1,116 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10Taxonomy:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def test_01_nested_taxonomy_with_quotes(self, admin_client):
+        category = {'name': 'Фильм "категории Б"', 'slug': 'b-movie'}
+        genre = {'name': 'Драма \\ "нуар"', 'slug': 'noir'}
+        admin_client.post('/api/v1/categories/', data=category)
+        admin_client.post('/api/v1/genres/', data=genre)
+        response = admin_client.post(self.TITLES_URL, data={
+            'name': 'Мальтийский сокол',
+            'year': 1941,
+            'genre': [genre['slug']],
+            'category': category['slug'],
+        })
+        assert response.status_code == HTTPStatus.CREATED, (
+            f'Если POST-запрос администратора к `{self.TITLES_URL}` '
+            'содержит корректные данные - должен вернуться ответ со '
+            'статусом 201.'
+        )
+        data = response.json()
+        assert data['category'] == category and data['genre'] == [genre], (
+            'Проверьте, что категория и жанры произведения сериализуются '
+            'корректно, даже если их названия содержат кавычки.'
+        )
+
+    def test_02_taxonomy_served_from_cache(self, client, admin_client):
+        url = '/api/v1/categories/'
+        admin_client.post(url, data={'name': 'Фильм', 'slug': 'movie'})
+        client.get(url)
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert not context.captured_queries, (
+            f'Проверьте, что повторный GET-запрос к `{url}` отдаёт '
+            'категории из кеша, не обращаясь к БД.'
+        )
+
+        admin_client.post(url, data={'name': 'Книга', 'slug': 'book'})
+        slugs = [item['slug'] for item in client.get(url).json()['results']]
+        assert slugs == ['book', 'movie'], (
+            'Проверьте, что кеш категорий сбрасывается при создании новой '
+            'категории.'
+        )
+        admin_client.delete(f'{url}movie/')
+        slugs = [item['slug'] for item in client.get(url).json()['results']]
+        assert slugs == ['book'], (
+            'Проверьте, что кеш категорий сбрасывается при удалении '
+            'категории.'
+        )
+
+    def test_03_version_cache_is_shared(self, settings):
+        from django.core import checks
+
+        assert not checks.run_checks(tags=[checks.Tags.caches]), (
+            'Проверьте, что в CACHES настроен кеш, общий для всех '
+            'процессов: счётчики версий в LocMemCache другие процессы '
+            'не видят.'
+        )
+        settings.CACHES = {**settings.CACHES, 'versions': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }}
+        ids = [
+            message.id
+            for message in checks.run_checks(tags=[checks.Tags.caches])
+        ]
+        assert 'reviews.W001' in ids, (
+            'Проверьте, что проверка Django предупреждает о кеше, '
+            'который виден только своему процессу.'
+        )
+
+    def test_04_versions_not_culled(self, settings):
+        from reviews.versions import bump_version, get_versions
+
+        settings.CACHES = {**settings.CACHES, 'versions': {
+            **settings.CACHES['versions'], 'OPTIONS': {'MAX_ENTRIES': 2},
+        }}
+        tags = [f'title:{number}' for number in range(5)]
+        versions = get_versions(*tags)
+        bump_version(*tags)
+        assert get_versions(*tags) == [
+            version + 1 for version in versions
+        ], (
+            'Проверьте, что счётчики версий не вытесняются из кеша по '
+            'MAX_ENTRIES: потеря счётчика сбрасывает зависящие от него '
+            'кеши.'
+        )
+
+    def test_05_miss_keeps_ordering(self):
+        from reviews import taxonomy
+        from reviews.models import Category
+
+        Category.objects.create(name='Книга', slug='book')
+        taxonomy.get_all(Category)
+        # Созданы другим процессом, который ещё не увеличил версию.
+        Category.objects.bulk_create([
+            Category(name='Яя', slug='ya'), Category(name='Аа', slug='aa')
+        ])
+        assert taxonomy.get_by_slug(Category, 'ya').name == 'Яя'
+        assert set(taxonomy.get_many_by_slug(Category, ['aa', 'x'])) == {
+            'aa'
+        }
+        assert [
+            category.name for category in taxonomy.get_all(Category)
+        ] == ['Аа', 'Книга', 'Яя'], (
+            'Проверьте, что найденный в БД объект справочника не '
+            'нарушает порядок Meta.ordering в кеше.'
+        )
@@ -0,0 +1,55 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11CursorPagination:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    def collect_pages(self, client, url):
+        results = []
+        while url:
+            response = client.get(url)
+            assert response.status_code == HTTPStatus.OK, (
+                f'Проверьте, что GET-запрос к `{url}` возвращает ответ со '
+                'статусом 200.'
+            )
+            data = response.json()
+            assert 'count' not in data, (
+                'В курсорном режиме пагинации ответ не должен содержать '
+                'ключ `count`.'
+            )
+            results.extend(data['results'])
+            url = data['next']
+        return results
+
+    def test_01_reviews_cursor_mode(self, admin_client, admin, user,
+                                    user_client, moderator,
+                                    moderator_client):
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client
+        }
+        reviews, titles = create_reviews(admin_client, author_map)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+
+        results = self.collect_pages(
+            admin_client, f'{url}?pagination=cursor&limit=2'
+        )
+        assert [item['id'] for item in results] == sorted(
+            (review['id'] for review in reviews), reverse=True
+        ), (
+            f'Проверьте, что курсорная пагинация `{url}` возвращает все '
+            'отзывы от новых к старым без повторов и пропусков.'
+        )
+
+        data = admin_client.get(url).json()
+        assert data['count'] == len(reviews), (
+            f'Проверьте, что без параметра `pagination=cursor` эндпоинт '
+            f'`{url}` по-прежнему использует постраничную пагинацию.'
+        )
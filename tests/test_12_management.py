@@ -0,0 +1,115 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12ManagementCommands:
+
+    def test_01_load_csv(self):
+        from reviews.models import Comment, GenreTitle, Review, Title
+
+        output = StringIO()
+        call_command('load_csv', batch_size=10, stdout=output)
+
+        assert Title.objects.count() == 32, (
+            'Проверьте, что команда `load_csv` загружает произведения из '
+            '`static/data/titles.csv`.'
+        )
+        assert GenreTitle.objects.count() == 42
+        assert Review.objects.count() == 72
+        assert Comment.objects.count() == 3
+        review = Review.objects.get(pk=1)
+        assert review.pub_date.year == 2019, (
+            'Проверьте, что команда `load_csv` сохраняет дату публикации '
+            'отзыва из файла.'
+        )
+        title = Title.objects.get(pk=review.title_id)
+        assert title.reviews_count == title.reviews.count(), (
+            'Проверьте, что после загрузки команда `load_csv` пересчитывает '
+            'сохранённый рейтинг произведений.'
+        )
+        assert 'строк/с' in output.getvalue(), (
+            'Проверьте, что команда `load_csv` сообщает скорость загрузки '
+            'каждой таблицы.'
+        )
+
+    def test_02_export_round_trip(self, tmp_path):
+        from reviews.export import iter_ndjson
+
+        call_command('load_csv', stdout=StringIO())
+        before = ''.join(iter_ndjson())
+        call_command(
+            'export_data', output_format='csv', output=str(tmp_path),
+            stderr=StringIO()
+        )
+        call_command('flush', interactive=False)
+        call_command('load_csv', path=str(tmp_path), stdout=StringIO())
+
+        assert ''.join(iter_ndjson()) == before, (
+            'Проверьте, что CSV, выгруженный командой `export_data`, '
+            'загружается обратно командой `load_csv` без потерь.'
+        )
+
+    def test_03_export_endpoint(self, admin_client, user_client):
+        call_command('load_csv', stdout=StringIO())
+        url = '/api/v1/titles/export/'
+        assert user_client.get(url).status_code == 403, (
+            f'Проверьте, что выгрузка `{url}` доступна только администратору.'
+        )
+        response = admin_client.get(url)
+        assert response.status_code == 200
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        assert len(lines) == 32 and json.loads(lines[0])['reviews'], (
+            f'Проверьте, что `{url}` отдаёт по строке NDJSON на каждое '
+            'произведение вместе с отзывами.'
+        )
+        response = admin_client.get(f'{url}?output=csv&table=review.csv')
+        content = b''.join(response.streaming_content).decode()
+        assert content.startswith('id,title_id,text,author,score,pub_date')
+
+    def test_04_benchmark_api(self, tmp_path):
+        from django.core.management.base import CommandError
+
+        call_command(
+            'generate_data', str(tmp_path), users=10, categories=2,
+            genres=3, titles=5, reviews=20, comments=30, stdout=StringIO()
+        )
+        call_command('load_csv', path=str(tmp_path), stdout=StringIO())
+        baseline = tmp_path / 'baseline.json'
+        output = StringIO()
+        call_command(
+            'benchmark_api', requests=2, save=str(baseline), stdout=output
+        )
+        results = json.loads(baseline.read_text())
+        assert {'titles-list', 'reviews-list', 'comments-list'} <= set(
+            results
+        ), (
+            'Проверьте, что команда `benchmark_api` замеряет все маршруты '
+            'из `api/urls.py`.'
+        )
+        assert all(
+            {'queries', 'p50_ms', 'p95_ms', 'p99_ms'} <= set(result)
+            for result in results.values()
+        )
+        assert all(
+            results[name]['queries'] > 0
+            for name in ('categories-list', 'titles-list', 'reviews-list')
+        ), (
+            'Проверьте, что `benchmark_api` замеряет запросы к БД, а не '
+            'ответы из кеша анонимных запросов.'
+        )
+        assert results['reviews-create']['status'] == 201, (
+            'Проверьте, что сценарий `reviews-create` замеряет создание '
+            'отзыва, а не ответ 400 на повторный отзыв.'
+        )
+
+        results['titles-list']['queries'] -= 1
+        baseline.write_text(json.dumps(results))
+        with pytest.raises(CommandError, match='titles-list'):
+            call_command(
+                'benchmark_api', requests=2, baseline=str(baseline),
+                latency_tolerance=1000, stdout=StringIO()
+            )
@@ -0,0 +1,43 @@
+import json
+import logging
+from http import HTTPStatus
+
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13RequestTiming:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def test_01_disabled_by_default(self, client):
+        response = client.get(self.TITLES_URL)
+        assert 'Server-Timing' not in response, (
+            'Проверьте, что заголовок `Server-Timing` не добавляется, если '
+            'замер запросов выключен.'
+        )
+
+    def test_02_server_timing_header(self, client, admin_client, settings):
+        settings.REQUEST_TIMING = {'ENABLED': True}
+        response = admin_client.get(self.TITLES_URL)
+        assert response.status_code == HTTPStatus.OK
+        header = response['Server-Timing']
+        for metric in ('db;dur=', 'queries"', 'view;dur=', 'auth;dur=',
+                       'perm;dur=', 'total;dur='):
+            assert metric in header, (
+                'Проверьте, что заголовок `Server-Timing` содержит метрику '
+                f'`{metric}`. Сейчас: {header}'
+            )
+
+    def test_03_slow_request_logs_sql(self, client, settings, caplog):
+        settings.REQUEST_TIMING = {'ENABLED': True, 'SLOW_REQUEST_MS': 0}
+        with caplog.at_level(logging.INFO, logger='api_yamdb.timing'):
+            client.get(self.TITLES_URL)
+        record = json.loads(caplog.records[-1].getMessage())
+        assert record['path'] == self.TITLES_URL
+        assert record['slow_sql'] and 'reviews_title' in ''.join(
+            query['sql'] for query in record['slow_sql']
+        ), (
+            'Проверьте, что для медленного запроса в лог пишутся самые '
+            'долгие SQL-запросы.'
+        )
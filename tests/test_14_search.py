@@ -0,0 +1,124 @@
+from http import HTTPStatus
+
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14Search:
+
+    TITLES_URL = '/api/v1/titles/'
+    REVIEWS_SEARCH_URL = '/api/v1/search/reviews/'
+
+    @pytest.fixture
+    def titles(self):
+        from reviews.models import Category, Title
+
+        category = Category.objects.create(name='Книга', slug='book')
+        return [
+            Title.objects.create(
+                name='Война и мир', year=1869, category=category,
+                description='Роман-эпопея о войне 1812 года'
+            ),
+            Title.objects.create(
+                name='Мир глазами кошки', year=2010, category=category,
+                description='Повесть'
+            ),
+            Title.objects.create(
+                name='Преступление и наказание', year=1866,
+                category=category, description='Роман о студенте'
+            ),
+        ]
+
+    def search(self, client, query):
+        response = client.get(self.TITLES_URL, {'q': query})
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{self.TITLES_URL}` с параметром '
+            '`q` возвращает ответ со статусом 200.'
+        )
+        return [item['id'] for item in response.json()['results']]
+
+    def test_01_title_search(self, client, titles):
+        war, cat, crime = titles
+        assert set(self.search(client, 'мир')) == {war.id, cat.id}, (
+            'Проверьте, что поиск `?q=` находит произведения по словам '
+            'названия без учёта регистра.'
+        )
+        assert set(self.search(client, 'роман')) == {war.id, crime.id}, (
+            'Проверьте, что поиск `?q=` ищет и по описанию произведения.'
+        )
+        assert self.search(client, 'преступ') == [crime.id], (
+            'Проверьте, что последнее слово запроса ищется по префиксу.'
+        )
+        assert self.search(client, 'война "мир') == [war.id], (
+            'Проверьте, что произведение должно содержать все слова '
+            'запроса, а кавычки в запросе не приводят к ошибке.'
+        )
+
+    def test_02_index_follows_changes(self, client, admin_client, titles):
+        war, cat, _ = titles
+        response = admin_client.patch(
+            f'{self.TITLES_URL}{cat.id}/', data={'name': 'Глазами кошки'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert self.search(client, 'мир') == [war.id], (
+            'Проверьте, что поисковый индекс обновляется при изменении '
+            'названия произведения.'
+        )
+        assert self.search(client, 'глазами') == [cat.id]
+        admin_client.delete(f'{self.TITLES_URL}{war.id}/')
+        assert self.search(client, 'мир') == [], (
+            'Проверьте, что удалённое произведение не находится поиском.'
+        )
+
+    def test_03_review_search(self, client, admin, user, titles):
+        from reviews.models import Review
+
+        war, cat, _ = titles
+        first = Review.objects.create(
+            title=war, author=admin, score=9, text='Великий роман'
+        )
+        Review.objects.create(
+            title=war, author=user, score=3, text='Слишком длинно'
+        )
+        second = Review.objects.create(
+            title=cat, author=admin, score=7, text='Милый роман про кошку'
+        )
+        response = client.get(self.REVIEWS_SEARCH_URL, {'q': 'роман'})
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{self.REVIEWS_SEARCH_URL}` '
+            'возвращает ответ со статусом 200.'
+        )
+        results = response.json()['results']
+        assert {item['id'] for item in results} == {first.id, second.id}, (
+            'Проверьте, что поиск по отзывам находит отзывы по тексту.'
+        )
+        assert {item['title'] for item in results} == {war.id, cat.id}, (
+            'Проверьте, что в результатах поиска указан id произведения.'
+        )
+
+        response = client.get(
+            self.REVIEWS_SEARCH_URL, {'q': 'роман', 'title': cat.id}
+        )
+        assert [item['id'] for item in response.json()['results']] == [
+            second.id
+        ], (
+            'Проверьте, что параметр `title` ограничивает поиск отзывами '
+            'одного произведения.'
+        )
+        response = client.get(self.REVIEWS_SEARCH_URL)
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            f'Проверьте, что GET-запрос к `{self.REVIEWS_SEARCH_URL}` без '
+            'параметра `q` возвращает ответ со статусом 400.'
+        )
+
+    @pytest.mark.parametrize('query', ['"', ' ', '!!'])
+    def test_04_query_without_words(self, client, titles, query):
+        assert self.search(client, query) == [], (
+            'Проверьте, что поиск `?q=` без слов возвращает пустой список.'
+        )
+        response = client.get(self.REVIEWS_SEARCH_URL, {'q': query})
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что поиск по отзывам с запросом без слов '
+            'возвращает ответ со статусом 200.'
+        )
+        assert response.json()['results'] == []
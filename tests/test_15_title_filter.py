@@ -0,0 +1,127 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15TitleFilter:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    @pytest.fixture
+    def titles(self):
+        from reviews.models import Category, Genre, Title
+
+        film = Category.objects.create(name='Фильм', slug='film')
+        filmstrip = Category.objects.create(
+            name='Диафильм', slug='filmstrip'
+        )
+        book = Category.objects.create(name='Книга', slug='book')
+        drama, comedy, crime = (
+            Genre.objects.create(name=name, slug=slug)
+            for name, slug in (
+                ('Драма', 'drama'), ('Комедия', 'comedy'),
+                ('Криминал', 'crime')
+            )
+        )
+        titles = {}
+        for name, year, category, genres in (
+            ('Трагикомедия', 1990, film, (drama, comedy)),
+            ('Драма', 2000, filmstrip, (drama,)),
+            ('Детектив', 2010, book, (crime, drama)),
+            ('Комедия', 2020, book, (comedy,)),
+        ):
+            titles[name] = Title.objects.create(
+                name=name, year=year, category=category
+            )
+            titles[name].genre.set(genres)
+        return titles
+
+    def names(self, client, **params):
+        response = client.get(self.TITLES_URL, params)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{self.TITLES_URL}` с фильтрами '
+            f'{params} возвращает ответ со статусом 200.'
+        )
+        return [item['name'] for item in response.json()['results']]
+
+    def test_01_category_exact_and_prefix(self, client, titles):
+        assert self.names(client, category='film') == ['Трагикомедия'], (
+            'Проверьте, что фильтр `category` сравнивает slug целиком, '
+            'а не ищет подстроку.'
+        )
+        assert self.names(client, category='film*') == [
+            'Драма', 'Трагикомедия'
+        ], (
+            'Проверьте, что фильтр `category=slug*` ищет категории по '
+            'префиксу slug.'
+        )
+        assert self.names(client, category='book,film') == [
+            'Детектив', 'Комедия', 'Трагикомедия'
+        ], (
+            'Проверьте, что фильтр `category` принимает несколько slug '
+            'через запятую.'
+        )
+
+    def test_02_genre_any_and_all(self, client, titles):
+        assert self.names(client, genre='drama,comedy') == [
+            'Детектив', 'Драма', 'Комедия', 'Трагикомедия'
+        ], (
+            'Проверьте, что фильтр по нескольким жанрам возвращает каждое '
+            'произведение один раз.'
+        )
+        assert self.names(
+            client, genre='drama,comedy', genre_match='all'
+        ) == ['Трагикомедия'], (
+            'Проверьте, что `genre_match=all` оставляет только '
+            'произведения со всеми перечисленными жанрами.'
+        )
+        assert self.names(client, genre='c*', genre_match='all') == [
+            'Детектив', 'Комедия', 'Трагикомедия'
+        ]
+        response = client.get(
+            self.TITLES_URL, {'genre': 'drama', 'genre_match': 'x'}
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что неизвестное значение `genre_match` возвращает '
+            'ответ со статусом 400.'
+        )
+
+    def test_03_year_range(self, client, titles):
+        assert self.names(client, year_min=2000, year_max=2010) == [
+            'Детектив', 'Драма'
+        ], (
+            'Проверьте, что фильтры `year_min` и `year_max` ограничивают '
+            'год выхода произведения включительно.'
+        )
+        assert self.names(client, year=2020) == ['Комедия']
+
+    def test_04_no_join_or_distinct(self, client, titles):
+        with CaptureQueriesContext(connection) as context:
+            self.names(client, genre='drama,comedy*', category='b*,film')
+        sql = next(
+            query['sql'] for query in context.captured_queries
+            if 'FROM "reviews_title"' in query['sql']
+            and 'COUNT' not in query['sql']
+        )
+        outer_sql = sql.split('EXISTS')[0]
+        assert 'DISTINCT' not in sql and 'genretitle' not in outer_sql, (
+            'Проверьте, что фильтр по жанрам не добавляет JOIN и DISTINCT '
+            'в основной запрос произведений.'
+        )
+        assert 'LIKE' not in sql, (
+            'Проверьте, что поиск по префиксу slug использует диапазон, '
+            'а не LIKE.'
+        )
+
+    @pytest.mark.parametrize('params', [
+        {'genre': '\U0010ffff*'}, {'category': '퟿*'},
+        {'category': 'фильм*'},
+    ])
+    def test_05_invalid_prefix(self, client, titles, params):
+        assert self.names(client, **params) == [], (
+            'Проверьте, что префикс с символами, недопустимыми в slug, '
+            'возвращает пустой список, а не ошибку.'
+        )
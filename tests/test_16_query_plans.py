@@ -0,0 +1,81 @@
+import re
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+FULL_SCAN = re.compile(r'^SCAN (TABLE )?\w+$')
+
+
+def query_plans(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200, (
+        f'Проверьте, что GET-запрос к `{url}` возвращает ответ со статусом '
+        '200.'
+    )
+    plans = []
+    with connection.cursor() as cursor:
+        for query in context.captured_queries:
+            if not query['sql'].startswith('SELECT'):
+                continue
+            cursor.execute(f'EXPLAIN QUERY PLAN {query["sql"]}')
+            plans.append(
+                (query['sql'], [row[-1] for row in cursor.fetchall()])
+            )
+    return plans
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16QueryPlans:
+
+    @pytest.fixture
+    def comment(self, admin):
+        from reviews.models import (
+            Category, Comment, Genre, GenreTitle, Review, Title
+        )
+
+        category = Category.objects.create(name='Книга', slug='book')
+        genre = Genre.objects.create(name='Драма', slug='drama')
+        title = Title.objects.create(name='Идиот', year=1869,
+                                     category=category)
+        GenreTitle.objects.create(title=title, genre=genre)
+        review = Review.objects.create(title=title, author=admin, score=8,
+                                       text='Текст')
+        return Comment.objects.create(review=review, author=admin,
+                                      text='Комментарий')
+
+    def test_01_migrations_are_complete(self):
+        try:
+            call_command('makemigrations', '--check', '--dry-run',
+                         verbosity=0)
+        except SystemExit:
+            pytest.fail(
+                'Проверьте, что миграции соответствуют моделям: '
+                '`makemigrations --check` нашёл изменения.'
+            )
+
+    @pytest.mark.parametrize('url', [
+        '/api/v1/titles/',
+        '/api/v1/titles/?year=1869',
+        '/api/v1/titles/?category=book',
+        '/api/v1/titles/{title_id}/reviews/',
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+    ])
+    def test_02_hot_queries_use_indexes(self, client, comment, url):
+        if connection.vendor != 'sqlite':
+            pytest.skip('План запроса проверяется только на SQLite.')
+        url = url.format(
+            title_id=comment.review.title_id, review_id=comment.review_id
+        )
+        for sql, plan in query_plans(client, url):
+            for step in plan:
+                assert not FULL_SCAN.match(step), (
+                    f'Проверьте индексы: запрос для `{url}` читает таблицу '
+                    f'целиком ({step}).\n{sql}'
+                )
+                assert 'TEMP B-TREE' not in step, (
+                    f'Проверьте индексы: запрос для `{url}` сортирует '
+                    f'результат во временном B-дереве ({step}).\n{sql}'
+                )
@@ -0,0 +1,109 @@
+from datetime import timedelta
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.utils.timezone import now
+
+
+class FailingBackend(EmailBackend):
+    def send_messages(self, messages):
+        raise ConnectionRefusedError('SMTP недоступен')
+
+
+class CountingBackend(EmailBackend):
+    instances = 0
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        CountingBackend.instances += 1
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17EmailOutbox:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+
+    @pytest.fixture(autouse=True)
+    def queued_mode(self, settings):
+        settings.EMAIL_OUTBOX = {
+            'EAGER': False, 'MAX_ATTEMPTS': 2, 'BACKOFF_SECONDS': 60
+        }
+
+    def signup(self, client, number=1):
+        return client.post(self.URL_SIGNUP, data={
+            'username': f'user{number}',
+            'email': f'user{number}@yamdb.fake',
+        })
+
+    def test_01_signup_enqueues_email(self, client):
+        from reviews.models import EmailOutbox
+
+        response = self.signup(client)
+        assert response.status_code == 200
+        assert len(mail.outbox) == 0, (
+            'Проверьте, что при регистрации письмо не отправляется во '
+            'время запроса, а ставится в очередь.'
+        )
+        email = EmailOutbox.objects.get()
+        assert email.to == 'user1@yamdb.fake' and email.sent_at is None
+
+        call_command('send_outbox')
+        assert [message.to for message in mail.outbox] == [
+            ['user1@yamdb.fake']
+        ], (
+            'Проверьте, что команда send_outbox отправляет письма из '
+            'очереди.'
+        )
+        email.refresh_from_db()
+        assert email.sent_at is not None and email.attempts == 1
+        call_command('send_outbox')
+        assert len(mail.outbox) == 1, (
+            'Проверьте, что отправленное письмо не отправляется повторно.'
+        )
+
+    def test_02_batch_uses_one_connection(self, client, settings):
+        for number in range(3):
+            self.signup(client, number)
+        settings.EMAIL_BACKEND = f'{__name__}.CountingBackend'
+        CountingBackend.instances = 0
+        call_command('send_outbox', batch_size=10)
+        assert len(mail.outbox) == 3
+        assert CountingBackend.instances == 1, (
+            'Проверьте, что пачка писем отправляется через одно '
+            'соединение с почтовым сервером.'
+        )
+
+    def test_03_retry_with_backoff(self, client, settings):
+        from reviews.models import EmailOutbox
+
+        self.signup(client)
+        settings.EMAIL_BACKEND = f'{__name__}.FailingBackend'
+        call_command('send_outbox')
+        email = EmailOutbox.objects.get()
+        assert email.attempts == 1 and email.sent_at is None
+        assert 'SMTP недоступен' in email.last_error
+        assert email.next_attempt_at > now() + timedelta(seconds=50), (
+            'Проверьте, что после ошибки следующая попытка откладывается.'
+        )
+        call_command('send_outbox')
+        email.refresh_from_db()
+        assert email.attempts == 1, (
+            'Проверьте, что письмо не отправляется повторно до срока '
+            'следующей попытки.'
+        )
+
+        EmailOutbox.objects.update(next_attempt_at=now())
+        call_command('send_outbox')
+        email.refresh_from_db()
+        assert email.attempts == 2 and email.next_attempt_at is None, (
+            'Проверьте, что после MAX_ATTEMPTS ошибок письмо больше не '
+            'отправляется.'
+        )
+
+        settings.EMAIL_BACKEND = (
+            'django.core.mail.backends.locmem.EmailBackend'
+        )
+        call_command('send_outbox')
+        assert len(mail.outbox) == 0
@@ -0,0 +1,103 @@
+from http import HTTPStatus
+
+import pytest
+from django.core import mail
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18ConfirmationCode:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+    URL_TOKEN = '/api/v1/auth/token/'
+    USER = {'username': 'reader', 'email': 'reader@yamdb.fake'}
+
+    def signup(self, client):
+        response = client.post(self.URL_SIGNUP, data=self.USER)
+        assert response.status_code == HTTPStatus.OK
+        return mail.outbox[-1].body.rsplit(' ', 1)[-1]
+
+    def get_token(self, client, code):
+        return client.post(self.URL_TOKEN, data={
+            'username': self.USER['username'], 'confirmation_code': code
+        })
+
+    def test_01_code_is_not_stored(self, client, django_user_model):
+        with CaptureQueriesContext(connection) as context:
+            code = self.signup(client)
+        user = django_user_model.objects.get(username=self.USER['username'])
+        assert not user.code, (
+            'Проверьте, что код подтверждения не сохраняется в БД.'
+        )
+        assert not any(
+            query['sql'].startswith('UPDATE "reviews_reviewsuser"')
+            for query in context
+        ), 'Проверьте, что регистрация не обновляет строку пользователя.'
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.get_token(client, code)
+        assert 'token' in response.json(), (
+            'Проверьте, что код из письма позволяет получить токен.'
+        )
+        assert all(
+            query['sql'].startswith('SELECT') for query in context
+        ), 'Проверьте, что проверка кода не пишет в БД.'
+
+    def test_02_invalid_codes(self, client, django_user_model):
+        code = self.signup(client)
+        tampered = code[:-1] + ('0' if code[-1] != '0' else '1')
+        for invalid in (tampered, 'abc', '123456', f'{code}-x'):
+            response = self.get_token(client, invalid)
+            assert response.status_code == HTTPStatus.BAD_REQUEST, (
+                f'Проверьте, что код `{invalid}` отклоняется.'
+            )
+        django_user_model.objects.filter(
+            username=self.USER['username']
+        ).update(email='other@yamdb.fake')
+        assert self.get_token(client, code).status_code == (
+            HTTPStatus.BAD_REQUEST
+        ), 'Проверьте, что смена email отзывает выданные коды.'
+
+    def test_03_code_expires(self, client, settings, monkeypatch):
+        from api.utils import ConfirmationCodeGenerator
+
+        code = self.signup(client)
+        now = ConfirmationCodeGenerator._now()
+        monkeypatch.setattr(
+            ConfirmationCodeGenerator, '_now',
+            staticmethod(lambda: now + settings.CONFIRMATION_CODE_TIMEOUT + 1)
+        )
+        assert self.get_token(client, code).status_code == (
+            HTTPStatus.BAD_REQUEST
+        ), 'Проверьте, что просроченный код отклоняется.'
+
+    def test_04_legacy_code(self, client, django_user_model, settings):
+        from datetime import timedelta
+
+        from django.utils import timezone
+
+        settings.LEGACY_CONFIRMATION_CODES_UNTIL = (
+            timezone.now() + timedelta(days=1)
+        )
+        django_user_model.objects.create(code='654321', **self.USER)
+        assert 'token' in self.get_token(client, '654321').json(), (
+            'Проверьте, что коды, сохранённые в БД до перехода на HMAC, '
+            'по-прежнему принимаются.'
+        )
+        response = self.get_token(client, '654321')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что старый код из БД одноразовый.'
+        )
+
+        django_user_model.objects.filter(
+            username=self.USER['username']
+        ).update(code='123456')
+        settings.LEGACY_CONFIRMATION_CODES_UNTIL = (
+            timezone.now() - timedelta(seconds=1)
+        )
+        response = self.get_token(client, '123456')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что старые коды из БД не принимаются после '
+            '`LEGACY_CONFIRMATION_CODES_UNTIL`.'
+        )
@@ -0,0 +1,82 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.test_09_query_count import data_queries
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19Signup:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+    USER = {'username': 'reader', 'email': 'reader@yamdb.fake'}
+
+    @pytest.fixture(autouse=True)
+    def queued_mode(self, settings):
+        settings.EMAIL_OUTBOX = {'EAGER': False}
+
+    def test_01_new_user_queries(self, client, django_user_model):
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(self.URL_SIGNUP, data=self.USER)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == self.USER
+        statements = [sql.split()[0] for sql in data_queries(context)]
+        assert statements == ['SELECT', 'INSERT', 'INSERT'], (
+            'Проверьте, что регистрация нового пользователя делает один '
+            'SELECT и вставляет пользователя и письмо без повторных '
+            f'запросов. Выполнено: {statements}.'
+        )
+
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(self.URL_SIGNUP, data=self.USER)
+        assert response.status_code == HTTPStatus.OK
+        statements = [sql.split()[0] for sql in data_queries(context)]
+        assert statements == ['SELECT', 'INSERT'], (
+            'Проверьте, что повторная регистрация той же пары находит '
+            f'пользователя одним запросом. Выполнено: {statements}.'
+        )
+        assert django_user_model.objects.count() == 1
+
+    def test_02_conflicts(self, client, django_user_model):
+        django_user_model.objects.create(**self.USER)
+        django_user_model.objects.create(
+            username='writer', email='writer@yamdb.fake'
+        )
+        for data, fields in (
+            ({'username': 'reader', 'email': 'new@yamdb.fake'},
+             {'username'}),
+            ({'username': 'new', 'email': 'reader@yamdb.fake'}, {'email'}),
+            ({'username': 'reader', 'email': 'writer@yamdb.fake'},
+             {'username', 'email'}),
+        ):
+            response = client.post(self.URL_SIGNUP, data=data)
+            assert response.status_code == HTTPStatus.BAD_REQUEST
+            assert set(response.json()) == fields, (
+                'Проверьте, что ответ указывает поля, занятые другими '
+                f'пользователями: ожидались {fields} для {data}.'
+            )
+        assert django_user_model.objects.count() == 2
+
+    def test_03_concurrent_signup(self, client, django_user_model,
+                                  monkeypatch):
+        from api.serializers import SignupSerializer
+
+        django_user_model.objects.create(**self.USER)
+        find_user = SignupSerializer.find_user
+        calls = []
+
+        def find_user_after_race(serializer):
+            # Первый поиск "не успел" увидеть параллельную вставку.
+            calls.append(serializer)
+            return None if len(calls) == 1 else find_user(serializer)
+
+        monkeypatch.setattr(SignupSerializer, 'find_user',
+                            find_user_after_race)
+        response = client.post(self.URL_SIGNUP, data=self.USER)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что конфликт уникального индекса при параллельной '
+            'регистрации той же пары не приводит к ошибке.'
+        )
+        assert django_user_model.objects.count() == 1
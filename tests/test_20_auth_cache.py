@@ -0,0 +1,79 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+USER_TABLE = '"reviews_reviewsuser"'
+
+
+def user_queries(context):
+    return [
+        query['sql'] for query in context.captured_queries
+        if USER_TABLE in query['sql']
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20AuthCache:
+
+    CATEGORIES_URL = '/api/v1/categories/'
+    ME_URL = '/api/v1/users/me/'
+
+    def test_01_user_served_from_cache(self, user_client):
+        user_client.get(self.CATEGORIES_URL)
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.get(self.CATEGORIES_URL)
+        assert response.status_code == HTTPStatus.OK
+        assert not user_queries(context), (
+            'Проверьте, что повторный запрос с тем же токеном не читает '
+            'пользователя из БД.'
+        )
+
+    def test_02_role_change_invalidates_cache(self, user, user_client):
+        data = {'name': 'Фильм', 'slug': 'movie'}
+        response = user_client.post(self.CATEGORIES_URL, data=data)
+        assert response.status_code == HTTPStatus.FORBIDDEN
+        user.role = 'admin'
+        user.save()
+        response = user_client.post(self.CATEGORIES_URL, data=data)
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что после смены роли пользователя закешированный '
+            'снимок сбрасывается и права проверяются по новой роли.'
+        )
+
+        user.is_active = False
+        user.save()
+        response = user_client.get(self.ME_URL)
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что заблокированный пользователь не проходит '
+            'аутентификацию.'
+        )
+
+    def test_03_me_returns_full_profile(self, user, user_client):
+        user_client.get(self.CATEGORIES_URL)
+        response = user_client.get(self.ME_URL)
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert data['email'] == user.email and data['bio'] == user.bio, (
+            f'Проверьте, что `{self.ME_URL}` возвращает полный профиль '
+            'пользователя, а не снимок из кеша аутентификации.'
+        )
+        response = user_client.patch(self.ME_URL, data={'bio': 'Новое'})
+        assert response.status_code == HTTPStatus.OK
+        user.refresh_from_db()
+        assert user.bio == 'Новое' and user.email == data['email']
+
+    def test_04_local_cache_not_used(self, settings, user, user_client):
+        settings.CACHES = {**settings.CACHES, 'versions': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }}
+        user_client.get(self.CATEGORIES_URL)
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.get(self.CATEGORIES_URL)
+        assert response.status_code == HTTPStatus.OK
+        assert user_queries(context), (
+            'Проверьте, что с кешем, который виден только своему процессу, '
+            'пользователь читается из БД: иначе другие процессы не узнают '
+            'о смене роли или блокировке.'
+        )
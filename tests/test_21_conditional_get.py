@@ -0,0 +1,117 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21ConditionalGet:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    @pytest.fixture
+    def title(self):
+        from reviews.models import Category, Genre, Title
+
+        category = Category.objects.create(name='Книга', slug='book')
+        Genre.objects.create(name='Драма', slug='drama')
+        return Title.objects.create(name='Идиот', year=1869,
+                                    category=category)
+
+    def assert_not_modified(self, client, url, etag):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            f'Проверьте, что GET-запрос к `{url}` с актуальным ETag в '
+            '`If-None-Match` возвращает ответ со статусом 304.'
+        )
+        assert not context.captured_queries, (
+            f'Проверьте, что ответ 304 для `{url}` отдаётся без запросов '
+            'к БД.'
+        )
+
+    def assert_modified(self, client, url, etag, message):
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, message
+        assert response['ETag'] != etag, message
+        return response['ETag']
+
+    def test_01_titles(self, client, admin_client, title):
+        from reviews.models import Genre
+
+        list_url = self.TITLES_URL
+        detail_url = f'{self.TITLES_URL}{title.id}/'
+        etags = {}
+        for url in (list_url, detail_url):
+            response = client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            assert response.has_header('ETag'), (
+                f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+                'заголовок ETag.'
+            )
+            etags[url] = response['ETag']
+            self.assert_not_modified(client, url, etags[url])
+
+        title.genre.set(Genre.objects.all())
+        for url in (list_url, detail_url):
+            etags[url] = self.assert_modified(
+                client, url, etags[url],
+                'Проверьте, что изменение жанров произведения меняет ETag.'
+            )
+
+        admin_client.post(f'{detail_url}reviews/', data={
+            'text': 'Отзыв', 'score': 7
+        })
+        for url in (list_url, detail_url):
+            etags[url] = self.assert_modified(
+                client, url, etags[url],
+                'Проверьте, что новый отзыв, меняющий рейтинг, меняет ETag '
+                'произведения.'
+            )
+
+        admin_client.post('/api/v1/categories/', data={
+            'name': 'Фильм', 'slug': 'movie'
+        })
+        self.assert_modified(
+            client, list_url, etags[list_url],
+            'Проверьте, что изменение категорий меняет ETag списка '
+            'произведений.'
+        )
+
+    def test_02_reviews_and_comments(self, client, admin_client, title):
+        reviews_url = f'{self.TITLES_URL}{title.id}/reviews/'
+        review = admin_client.post(reviews_url, data={
+            'text': 'Отзыв', 'score': 7
+        }).json()
+        comments_url = f'{reviews_url}{review["id"]}/comments/'
+        etags = {
+            url: client.get(url)['ETag'] for url in (reviews_url, comments_url)
+        }
+        for url, etag in etags.items():
+            self.assert_not_modified(client, url, etag)
+
+        admin_client.patch(f'{reviews_url}{review["id"]}/', data={'score': 3})
+        etags[reviews_url] = self.assert_modified(
+            client, reviews_url, etags[reviews_url],
+            'Проверьте, что изменение оценки меняет ETag списка отзывов.'
+        )
+        self.assert_not_modified(client, comments_url, etags[comments_url])
+
+        admin_client.post(comments_url, data={'text': 'Комментарий'})
+        self.assert_modified(
+            client, comments_url, etags[comments_url],
+            'Проверьте, что новый комментарий меняет ETag списка '
+            'комментариев.'
+        )
+        self.assert_not_modified(client, reviews_url, etags[reviews_url])
+
+    def test_03_taxonomy(self, client, admin_client):
+        url = '/api/v1/genres/'
+        etag = client.get(url)['ETag']
+        self.assert_not_modified(client, url, etag)
+        admin_client.post(url, data={'name': 'Драма', 'slug': 'drama'})
+        self.assert_modified(
+            client, url, etag,
+            'Проверьте, что новый жанр меняет ETag списка жанров.'
+        )
@@ -0,0 +1,152 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.fixture(params=['locmem', 'filebased', 'db'])
+def response_cache(request, settings, tmp_path):
+    backends = {
+        'locmem': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'responses',
+        },
+        'filebased': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': str(tmp_path / 'responses'),
+        },
+        'db': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'api_response_cache',
+        },
+    }
+    settings.CACHES = {**settings.CACHES, 'responses': backends[request.param]}
+    settings.RESPONSE_CACHE = {'ENABLED': True, 'ALIAS': 'responses',
+                               'TIMEOUT': 60}
+    if request.param == 'db':
+        call_command('createcachetable', 'api_response_cache', verbosity=0)
+    from django.core.cache import caches
+
+    yield caches['responses']
+    caches['responses'].clear()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22ResponseCache:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    @pytest.fixture
+    def review(self, admin_client):
+        from reviews.models import Category, Genre, Review, Title
+
+        category = Category.objects.create(name='Книга', slug='book')
+        Genre.objects.create(name='Драма', slug='drama')
+        title = Title.objects.create(name='Идиот', year=1869,
+                                     category=category)
+        response = admin_client.post(
+            f'{self.TITLES_URL}{title.id}/reviews/',
+            data={'text': 'Текст', 'score': 8}
+        )
+        return Review.objects.get(pk=response.json()['id'])
+
+    def get(self, client, url, **extra):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url, **extra)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает ответ со '
+            'статусом 200.'
+        )
+        return response, [
+            query for query in context.captured_queries
+            if 'api_response_cache' not in query['sql']
+        ]
+
+    def assert_cached(self, client, url, **extra):
+        first, _ = self.get(client, url, **extra)
+        second, queries = self.get(client, url, **extra)
+        assert not queries, (
+            f'Проверьте, что повторный анонимный GET-запрос к `{url}` '
+            'отдаётся из кеша без запросов к БД.'
+        )
+        assert second.content == first.content, (
+            f'Проверьте, что из кеша для `{url}` отдаётся тот же ответ.'
+        )
+        assert second['Content-Type'] == first['Content-Type']
+        return second
+
+    def test_01_anonymous_hits(self, client, response_cache, review):
+        title_url = f'{self.TITLES_URL}{review.title_id}/'
+        for url in (
+            self.TITLES_URL, title_url, f'{title_url}reviews/',
+            '/api/v1/categories/', '/api/v1/genres/',
+        ):
+            self.assert_cached(client, url)
+
+        self.get(client, self.TITLES_URL, data={'year': 1869, 'name': 'И'})
+        _, queries = self.get(
+            client, self.TITLES_URL, data={'name': 'И', 'year': 1869}
+        )
+        assert not queries, (
+            'Проверьте, что ключ кеша не зависит от порядка параметров '
+            'в строке запроса.'
+        )
+
+        response, queries = self.get(
+            client, title_url, HTTP_ACCEPT='text/html'
+        )
+        assert queries and 'text/html' in response['Content-Type'], (
+            'Проверьте, что ответы в разных форматах кешируются '
+            'раздельно.'
+        )
+
+    def test_02_invalidation_by_tag(self, client, admin_client,
+                                    response_cache, review):
+        title_url = f'{self.TITLES_URL}{review.title_id}/'
+        reviews_url = f'{title_url}reviews/'
+        for url in (self.TITLES_URL, title_url, reviews_url):
+            self.assert_cached(client, url)
+
+        admin_client.patch(f'{reviews_url}{review.id}/', data={'score': 2})
+        for url in (self.TITLES_URL, title_url, reviews_url):
+            response, queries = self.get(client, url)
+            assert queries, (
+                f'Проверьте, что изменение отзыва сбрасывает кеш `{url}`.'
+            )
+        assert response.json()['results'][0]['score'] == 2
+
+        categories_response, _ = self.get(client, '/api/v1/categories/')
+        admin_client.post('/api/v1/categories/', data={
+            'name': 'Фильм', 'slug': 'movie'
+        })
+        response, queries = self.get(client, '/api/v1/categories/')
+        assert queries and response.content != categories_response.content, (
+            'Проверьте, что изменение справочника сбрасывает кеш категорий.'
+        )
+        _, queries = self.get(client, reviews_url)
+        assert not queries, (
+            'Проверьте, что изменение справочника не сбрасывает кеш '
+            'отзывов.'
+        )
+
+    def test_03_authenticated_not_cached(self, admin_client,
+                                         response_cache, review):
+        self.get(admin_client, self.TITLES_URL)
+        _, queries = self.get(admin_client, self.TITLES_URL)
+        assert queries, (
+            'Проверьте, что ответы авторизованным пользователям не '
+            'берутся из общего кеша.'
+        )
+
+    def test_04_key_includes_host(self, client, response_cache, review):
+        url = f'{self.TITLES_URL}?limit=1&offset=0'
+        self.get(client, url, HTTP_HOST='a.example')
+        response, queries = self.get(
+            client, url, HTTP_HOST='b.example', secure=True
+        )
+        assert queries and b'a.example' not in response.content, (
+            'Проверьте, что ключ кеша учитывает схему и хост: ссылки '
+            'пагинации в ответе абсолютные.'
+        )
@@ -0,0 +1,153 @@
+import json
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23TitleBulk:
+
+    BULK_URL = '/api/v1/titles/bulk/'
+
+    @pytest.fixture
+    def taxonomy(self):
+        from reviews.models import Category, Genre
+
+        Category.objects.create(name='Книга', slug='book')
+        Genre.objects.create(name='Драма', slug='drama')
+        Genre.objects.create(name='Комедия', slug='comedy')
+
+    def post(self, client, items):
+        return client.post(self.BULK_URL, data=json.dumps(items),
+                           content_type='application/json')
+
+    def test_01_create_all(self, admin_client, taxonomy):
+        from reviews.models import Title
+
+        items = [
+            {'name': f'Произведение {number}', 'year': 1900 + number,
+             'category': 'book', 'genre': ['drama', 'comedy'][:number % 2 + 1],
+             'description': 'Описание'}
+            for number in range(50)
+        ]
+        response = self.post(admin_client, items)
+        assert response.status_code == HTTPStatus.CREATED, (
+            f'Проверьте, что POST-запрос к `{self.BULK_URL}` с корректными '
+            'произведениями возвращает ответ со статусом 201.'
+        )
+        ids = [item['id'] for item in response.json()]
+        titles = Title.objects.in_bulk(ids)
+        assert [titles[pk].name for pk in ids] == [
+            item['name'] for item in items
+        ], (
+            'Проверьте, что ответ содержит id созданных произведений в '
+            'порядке запроса.'
+        )
+        for pk, item in zip(ids, items):
+            assert sorted(
+                titles[pk].genre.values_list('slug', flat=True)
+            ) == sorted(item['genre']), (
+                'Проверьте, что произведениям из пакета назначены жанры.'
+            )
+            assert titles[pk].category.slug == 'book'
+
+    def test_02_query_count(self, admin_client, taxonomy):
+        items = [
+            {'name': f'Произведение {number}', 'year': 2000,
+             'category': 'book', 'genre': ['drama', 'comedy']}
+            for number in range(200)
+        ]
+        with CaptureQueriesContext(connection) as context:
+            response = self.post(admin_client, items)
+        assert response.status_code == HTTPStatus.CREATED
+        inserts = [
+            query for query in context.captured_queries
+            if query['sql'].startswith((
+                'INSERT INTO "reviews_title"',
+                'INSERT INTO "reviews_genretitle"',
+            ))
+        ]
+        assert len(inserts) <= 4, (
+            'Проверьте, что произведения и связи с жанрами вставляются '
+            'через bulk_create, а не по одному.'
+        )
+        assert len(context.captured_queries) <= 20, (
+            'Проверьте, что число запросов к БД не зависит от размера '
+            'пакета.'
+        )
+
+    def test_03_errors_per_item(self, admin_client, client, user_client,
+                                taxonomy):
+        from reviews.models import Title
+
+        items = [
+            {'name': 'Годное', 'year': 2000, 'category': 'book',
+             'genre': ['drama']},
+            {'name': 'Без жанра', 'year': 2000, 'category': 'book',
+             'genre': []},
+            {'name': 'Чужая категория', 'year': 2000, 'category': 'film',
+             'genre': ['drama']},
+            {'name': 'Из будущего', 'year': 3000, 'category': 'book',
+             'genre': ['comedy']},
+            'не объект',
+            {'name': 'Категория-список', 'year': 2000,
+             'category': ['book'], 'genre': ['drama']},
+            {'name': 'Жанр-объект', 'year': 2000, 'category': 'book',
+             'genre': [{'slug': 'drama'}]},
+        ]
+        response = self.post(admin_client, items)
+        assert response.status_code == HTTPStatus.MULTI_STATUS, (
+            'Проверьте, что пакет, созданный частично, возвращает ответ со '
+            'статусом 207.'
+        )
+        results = response.json()
+        assert len(results) == len(items)
+        assert Title.objects.filter(pk=results[0]['id']).exists()
+        assert 'genre' in results[1]['errors']
+        assert 'category' in results[2]['errors']
+        assert 'year' in results[3]['errors']
+        assert 'errors' in results[4]
+        assert 'category' in results[5]['errors'], (
+            'Проверьте, что некорректный slug категории возвращает ошибку '
+            'элемента, а не ошибку сервера.'
+        )
+        assert 'genre' in results[6]['errors']
+        assert Title.objects.count() == 1, (
+            'Проверьте, что произведения с ошибками не создаются.'
+        )
+
+        response = self.post(admin_client, items[1:])
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что пакет без единого корректного произведения '
+            'возвращает ответ со статусом 400.'
+        )
+        response = self.post(admin_client, {'name': 'Не список'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        for other in (client, user_client):
+            response = self.post(other, items[:1])
+            assert response.status_code in (
+                HTTPStatus.UNAUTHORIZED, HTTPStatus.FORBIDDEN
+            ), (
+                f'Проверьте, что `{self.BULK_URL}` доступен только '
+                'администратору.'
+            )
+
+    def test_04_catalog_sees_new_titles(self, admin_client, client,
+                                        taxonomy):
+        assert client.get('/api/v1/titles/').json()['count'] == 0
+        response = self.post(admin_client, [
+            {'name': 'Война и мир', 'year': 1869, 'category': 'book',
+             'genre': ['drama']}
+        ])
+        assert response.status_code == HTTPStatus.CREATED
+        assert client.get('/api/v1/titles/').json()['count'] == 1, (
+            'Проверьте, что пакетная вставка сбрасывает кеш списка '
+            'произведений.'
+        )
+        found = client.get('/api/v1/titles/', {'q': 'война'}).json()
+        assert found['count'] == 1, (
+            'Проверьте, что произведения из пакета попадают в поисковый '
+            'индекс.'
+        )
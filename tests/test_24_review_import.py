@@ -0,0 +1,175 @@
+import json
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24ReviewImport:
+
+    IMPORT_URL = '/api/v1/import/reviews/'
+
+    @pytest.fixture
+    def titles(self):
+        from reviews.models import Category, Title
+
+        category = Category.objects.create(name='Книга', slug='book')
+        return [
+            Title.objects.create(name=f'Произведение {number}', year=2000,
+                                 category=category)
+            for number in range(3)
+        ]
+
+    def post(self, client, items, **params):
+        url = self.IMPORT_URL
+        if params:
+            url += '?' + '&'.join(f'{k}={v}' for k, v in params.items())
+        return client.post(url, data=json.dumps(items),
+                           content_type='application/json')
+
+    def test_01_import_updates_ratings(self, admin_client, admin, user,
+                                       titles):
+        from reviews.models import Review, Title
+
+        first, second, _ = titles
+        response = self.post(admin_client, [
+            {'title': first.id, 'author': admin.username, 'score': 10,
+             'text': 'Отлично'},
+            {'title': first.id, 'author': user.username, 'score': 4,
+             'text': 'Так себе'},
+            {'title': second.id, 'author': user.username, 'score': 7,
+             'text': 'Неплохо'},
+        ])
+        assert response.status_code == HTTPStatus.CREATED, (
+            f'Проверьте, что POST-запрос к `{self.IMPORT_URL}` с корректными '
+            'отзывами возвращает ответ со статусом 201.'
+        )
+        assert response.json() == [{'result': 'created'}] * 3
+        assert Review.objects.count() == 3
+        first = Title.objects.get(pk=first.id)
+        assert (first.reviews_count, first.rating) == (2, 7), (
+            'Проверьте, что после импорта пересчитываются количество '
+            'отзывов и рейтинг произведений.'
+        )
+        assert Title.objects.get(pk=second.id).rating == 7
+
+    def test_02_conflicts(self, admin_client, admin, titles):
+        from reviews.models import Review, Title
+
+        title = titles[0]
+        row = {'title': title.id, 'author': admin.username, 'score': 2,
+               'text': 'Первый'}
+        self.post(admin_client, [row])
+        response = self.post(
+            admin_client, [{**row, 'score': 9, 'text': 'Второй'}]
+        )
+        assert response.json() == [{'result': 'skipped'}], (
+            'Проверьте, что по умолчанию существующий отзыв автора '
+            'пропускается.'
+        )
+        assert Review.objects.get().score == 2
+
+        response = self.post(
+            admin_client, [{**row, 'score': 9, 'text': 'Второй'}],
+            on_conflict='update'
+        )
+        assert response.json() == [{'result': 'updated'}], (
+            'Проверьте, что `on_conflict=update` обновляет существующий '
+            'отзыв автора.'
+        )
+        review = Review.objects.get()
+        assert (review.score, review.text) == (9, 'Второй')
+        assert Title.objects.get(pk=title.id).rating == 9, (
+            'Проверьте, что обновление отзывов пересчитывает рейтинг.'
+        )
+        response = self.post(
+            admin_client, [{**row, 'score': 9, 'text': 'Второй'}],
+            on_conflict='update'
+        )
+        assert response.json() == [{'result': 'skipped'}], (
+            'Проверьте, что отзыв без изменений не перезаписывается.'
+        )
+
+        response = self.post(admin_client, [row], on_conflict='replace')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_03_errors_per_item(self, admin_client, client, user_client,
+                                admin, titles):
+        from reviews.models import Review
+
+        title = titles[0]
+        row = {'title': title.id, 'author': admin.username, 'score': 5,
+               'text': 'Годный'}
+        response = self.post(admin_client, [
+            row,
+            {'title': 10 ** 6, 'author': admin.username, 'score': 5,
+             'text': 'Нет произведения'},
+            {'title': title.id, 'author': 'nobody', 'score': 5,
+             'text': 'Нет автора'},
+            {'title': title.id, 'author': admin.username, 'score': 11,
+             'text': 'Оценка'},
+        ])
+        assert response.status_code == HTTPStatus.MULTI_STATUS, (
+            'Проверьте, что частично принятый пакет возвращает ответ со '
+            'статусом 207.'
+        )
+        results = response.json()
+        assert results[0] == {'result': 'created'}
+        assert 'title' in results[1]['errors']
+        assert 'author' in results[2]['errors']
+        assert 'score' in results[3]['errors']
+        assert Review.objects.count() == 1
+
+        for other in (client, user_client):
+            response = self.post(other, [row])
+            assert response.status_code in (
+                HTTPStatus.UNAUTHORIZED, HTTPStatus.FORBIDDEN
+            ), (
+                f'Проверьте, что `{self.IMPORT_URL}` доступен только '
+                'администратору.'
+            )
+
+    def test_04_query_count(self, admin_client, django_user_model, titles):
+        users = django_user_model.objects.bulk_create(
+            django_user_model(username=f'user{number}',
+                              email=f'user{number}@yamdb.fake')
+            for number in range(100)
+        )
+        items = [
+            {'title': title.id, 'author': user.username, 'score': 5,
+             'text': 'Отзыв'}
+            for title in titles for user in users
+        ]
+        with CaptureQueriesContext(connection) as context:
+            response = self.post(admin_client, items)
+        assert response.status_code == HTTPStatus.CREATED
+        assert len(context.captured_queries) <= 15, (
+            'Проверьте, что число запросов к БД при импорте не зависит от '
+            'размера пакета.'
+        )
+
+    def test_05_command(self, admin, user, titles, tmp_path):
+        from reviews.models import Review, Title
+
+        title = titles[0]
+        path = tmp_path / 'reviews.csv'
+        path.write_text(
+            'title_id,author,score,text\n'
+            f'{title.id},{admin.username},8,Отлично\n'
+            f'{title.id},{user.username},x,Ошибка\n'
+            f'{title.id},{user.username},4,"Так, себе"\n'
+            f'{title.id},{admin.username},6,Повтор\n',
+            encoding='utf-8'
+        )
+        call_command('import_reviews', str(path), batch_size=2,
+                     on_conflict='update')
+        assert dict(Review.objects.values_list('author_id', 'score')) == {
+            admin.id: 6, user.id: 4
+        }, (
+            'Проверьте, что команда import_reviews загружает отзывы и '
+            'обновляет существующие с `--on-conflict update`.'
+        )
+        assert Title.objects.get(pk=title.id).rating == 5
@@ -0,0 +1,174 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+
+from .test_16_query_plans import FULL_SCAN, query_plans
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25Leaderboards:
+
+    URL = '/api/v1/leaderboards/'
+
+    @pytest.fixture
+    def catalog(self, django_user_model):
+        from reviews.models import Category, Genre, Review, Title
+        from reviews.ratings import rebuild_ratings
+
+        book = Category.objects.create(name='Книга', slug='book')
+        movie = Category.objects.create(name='Фильм', slug='movie')
+        drama = Genre.objects.create(name='Драма', slug='drama')
+        comedy = Genre.objects.create(name='Комедия', slug='comedy')
+        authors = [
+            django_user_model.objects.create(
+                username=f'author{number}', email=f'author{number}@yamdb.fake'
+            )
+            for number in range(6)
+        ]
+        titles = {}
+        for name, year, category, genres, scores in (
+            ('Один отзыв', 2000, book, [drama], [10]),
+            ('Проверенное', 2000, book, [drama, comedy], [9] * 6),
+            ('Среднее', 2010, movie, [comedy], [7] * 6),
+            ('Без отзывов', 2000, book, [drama], []),
+        ):
+            title = Title.objects.create(name=name, year=year,
+                                         category=category)
+            title.genre.set(genres)
+            Review.objects.bulk_create(
+                Review(title=title, author=author, score=score, text='Ок')
+                for author, score in zip(authors, scores)
+            )
+            titles[name] = title
+        rebuild_ratings([title.pk for title in titles.values()])
+        return titles
+
+    def names(self, client, **params):
+        response = client.get(self.URL, params)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{self.URL}` с параметрами '
+            f'{params} возвращает ответ со статусом 200.'
+        )
+        return [item['title']['name'] for item in response.json()['results']]
+
+    def test_01_weighted_order(self, client, catalog):
+        assert self.names(client) == [
+            'Проверенное', 'Среднее', 'Один отзыв'
+        ], (
+            'Проверьте, что рейтинг отсортирован по взвешенной оценке: '
+            'произведение с одним отзывом не обгоняет проверенные, а '
+            'произведения без отзывов не выводятся.'
+        )
+        item = client.get(self.URL).json()['results'][0]
+        assert item['score'] == pytest.approx((54 + 5 * 5.5) / 11)
+        assert item['title']['rating'] == 9
+
+    def test_02_boards(self, client, catalog):
+        assert self.names(client, genre='comedy') == [
+            'Проверенное', 'Среднее'
+        ]
+        assert self.names(client, category='book') == [
+            'Проверенное', 'Один отзыв'
+        ]
+        assert self.names(client, year=2010) == ['Среднее']
+        assert self.names(client, category='book', year=2010) == []
+        assert self.names(client, category='unknown') == []
+        response = client.get(self.URL, {'genre': 'drama', 'year': 2000})
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что жанр не сочетается с другими условиями '
+            'рейтинга.'
+        )
+
+    def test_03_incremental_refresh(self, client, admin_client, catalog):
+        from reviews.models import Genre
+
+        title = catalog['Без отзывов']
+        response = admin_client.post(
+            f'/api/v1/titles/{title.id}/reviews/',
+            data={'text': 'Шедевр', 'score': 10}
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        assert 'Без отзывов' in self.names(client, genre='drama'), (
+            'Проверьте, что новый отзыв сразу попадает в рейтинги '
+            'произведения.'
+        )
+
+        review_id = response.json()['id']
+        admin_client.patch(
+            f'/api/v1/titles/{title.id}/reviews/{review_id}/',
+            data={'score': 1}
+        )
+        assert self.names(client, genre='drama')[-1] == 'Без отзывов', (
+            'Проверьте, что изменение оценки сдвигает произведение в '
+            'рейтинге.'
+        )
+
+        title.genre.set(Genre.objects.filter(slug='comedy'))
+        assert 'Без отзывов' not in self.names(client, genre='drama'), (
+            'Проверьте, что смена жанров переносит произведение между '
+            'рейтингами жанров.'
+        )
+        assert 'Без отзывов' in self.names(client, genre='comedy')
+
+        admin_client.delete(f'/api/v1/titles/{title.id}/')
+        assert 'Без отзывов' not in self.names(client)
+
+    def test_04_title_ordering(self, client, catalog):
+        response = client.get('/api/v1/titles/', {'ordering': '-rating'})
+        assert response.status_code == HTTPStatus.OK
+        names = [item['name'] for item in response.json()['results']]
+        assert names[:3] == ['Один отзыв', 'Проверенное', 'Среднее'], (
+            'Проверьте, что `?ordering=-rating` сортирует произведения по '
+            'убыванию рейтинга.'
+        )
+
+    def test_05_query_plan(self, client, catalog):
+        if connection.vendor != 'sqlite':
+            pytest.skip('План запроса проверяется только на SQLite.')
+        for url in (self.URL, f'{self.URL}?genre=drama'):
+            for sql, plan in query_plans(client, url):
+                # Справочники целиком читает кеш reviews.taxonomy.
+                if 'reviews_leaderboardentry' not in sql:
+                    continue
+                for step in plan:
+                    assert not FULL_SCAN.match(step) and (
+                        'TEMP B-TREE' not in step
+                    ), (
+                        f'Проверьте, что рейтинг `{url}` читается по '
+                        f'индексу без сортировки ({step}).\n{sql}'
+                    )
+
+    def test_06_deleted_genre(self, client, admin_client, catalog):
+        from reviews.leaderboards import board_key, rebuild
+        from reviews.models import Genre, LeaderboardEntry
+
+        drama = Genre.objects.get(slug='drama')
+        board = board_key(genre_id=drama.pk)
+        drama.delete()
+        assert not LeaderboardEntry.objects.filter(
+            board=board
+        ).exists(), 'Проверьте, что удаление жанра удаляет его рейтинг.'
+        title = catalog['Проверенное']
+        response = admin_client.patch(
+            f'/api/v1/titles/{title.id}/', data={'name': 'Переименовано'}
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что произведение с удалённым жанром обновляется '
+            'без ошибки.'
+        )
+        rebuild()
+        assert self.names(client)[0] == 'Переименовано', (
+            'Проверьте, что связь с удалённым жанром не ломает пересборку '
+            'рейтингов.'
+        )
+
+    def test_07_str(self, catalog):
+        from reviews.models import LeaderboardEntry
+
+        entries = LeaderboardEntry.objects.filter(board='all')
+        assert all(str(entry) for entry in entries), (
+            'Проверьте, что строковое представление записи рейтинга '
+            'работает и для произведения без оценки.'
+        )
+        assert entries.filter(score__isnull=True).exists()
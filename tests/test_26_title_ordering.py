@@ -0,0 +1,137 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+
+from tests.test_16_query_plans import FULL_SCAN, query_plans
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26TitleOrdering:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    @pytest.fixture
+    def titles(self):
+        from reviews.models import Category, Title
+
+        category = Category.objects.create(name='Книга', slug='book')
+        titles = [
+            Title.objects.create(name=name, year=year, category=category)
+            for name, year in (
+                ('Белые ночи', 1848), ('Бесы', 1872),
+                ('Бесы', 1872), ('Альманах', 1900),
+            )
+        ]
+        for title, reviews_count, rating in zip(
+            titles, (3, 1, 3, 0), (8, 6, 8, None)
+        ):
+            Title.objects.filter(pk=title.pk).update(
+                reviews_count=reviews_count, score_sum=reviews_count * 8,
+                rating=rating
+            )
+        return [title.pk for title in titles]
+
+    def ids(self, client, **params):
+        response = client.get(self.TITLES_URL, params)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{self.TITLES_URL}` с параметрами '
+            f'{params} возвращает ответ со статусом 200.'
+        )
+        return [item['id'] for item in response.json()['results']]
+
+    @pytest.mark.parametrize('ordering, order', [
+        ('name', (3, 0, 1, 2)),
+        ('-name', (2, 1, 0, 3)),
+        ('year', (0, 1, 2, 3)),
+        ('-year', (3, 2, 1, 0)),
+        ('reviews_count', (3, 1, 0, 2)),
+        ('-reviews_count', (2, 0, 1, 3)),
+        ('rating', (1, 0, 2)),
+        ('-rating', (2, 0, 1, 3)),
+    ])
+    def test_01_ordering_with_id_tiebreak(self, client, titles, ordering,
+                                          order):
+        ids = self.ids(client, ordering=ordering)
+        if ordering == 'rating':
+            # Положение NULL при возрастании зависит от СУБД.
+            ids = [pk for pk in ids if pk != titles[3]]
+        assert ids == [titles[index] for index in order], (
+            f'Проверьте, что `?ordering={ordering}` сортирует произведения '
+            'по полю, а при равных значениях - по id в том же направлении.'
+        )
+
+    def test_02_whitelist(self, client, titles):
+        assert self.ids(client, ordering='description') == self.ids(
+            client
+        ), (
+            'Проверьте, что `?ordering=` по полю вне списка '
+            '`ordering_fields` не меняет порядок по умолчанию.'
+        )
+        assert self.ids(client, ordering='-year,name') == self.ids(
+            client, ordering='-year'
+        ), (
+            'Проверьте, что из нескольких ключей `?ordering=` '
+            'используется только первый.'
+        )
+
+    @pytest.mark.parametrize('ordering', [
+        'name', '-name', 'year', '-year', 'reviews_count', '-reviews_count',
+        'rating', '-rating',
+    ])
+    def test_03_ordering_uses_index(self, client, titles, ordering):
+        if connection.vendor != 'sqlite':
+            pytest.skip('План запроса проверяется только на SQLite.')
+        url = f'{self.TITLES_URL}?ordering={ordering}'
+        plans = [
+            (sql, plan) for sql, plan in query_plans(client, url)
+            if 'FROM "reviews_title"' in sql and 'ORDER BY' in sql
+        ]
+        assert plans, f'Не найден запрос списка произведений для `{url}`.'
+        for sql, plan in plans:
+            for step in plan:
+                assert not FULL_SCAN.match(step) and (
+                    'TEMP B-TREE' not in step
+                ), (
+                    f'Проверьте, что `{url}` читает произведения по '
+                    f'индексу без сортировки ({step}).\n{sql}'
+                )
+
+    def test_04_cursor_pagination(self, client, titles):
+        response = client.get(self.TITLES_URL, {
+            'pagination': 'cursor', 'limit': 2, 'ordering': '-year'
+        })
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        ids = [item['id'] for item in data['results']]
+        response = client.get(data['next'])
+        ids += [item['id'] for item in response.json()['results']]
+        assert ids == [titles[index] for index in (3, 2, 1, 0)], (
+            'Проверьте, что курсорная пагинация продолжает сортировку '
+            '`?ordering=` со следующей страницы.'
+        )
+        response = client.get(self.TITLES_URL, {
+            'pagination': 'cursor', 'ordering': '-rating'
+        })
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что курсорная пагинация по `rating`, который '
+            'бывает пустым, возвращает ответ со статусом 400.'
+        )
+        response = client.get(self.TITLES_URL, {
+            'pagination': 'cursor', 'ordering': 'description'
+        })
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что курсорная пагинация с недопустимым '
+            '`?ordering=` использует порядок по умолчанию.'
+        )
+        assert [item['id'] for item in response.json()['results']] == [
+            titles[index] for index in (3, 0, 1, 2)
+        ]
+
+    def test_05_default_order_tiebreak(self, client, titles):
+        assert self.ids(client) == [
+            titles[index] for index in (3, 0, 1, 2)
+        ], (
+            'Проверьте, что без `?ordering=` произведения с одинаковым '
+            'названием упорядочены по id.'
+        )